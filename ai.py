@@ -1,7 +1,18 @@
 # ai.py
 
+import json
+import random
 import time
+from array import array
+from collections import deque
+from multiprocessing import Pool
 from echo_maze import EchoMaze
+from game_session import GameSession, MOVE, ECHO
+from maze_batch import generate_batch
+from maze_io import Corpus
+from maze_seeds import derive_seed
+from maze_profile import Histogram, PhaseStats, print_summary, wilson_interval
+from replay import ReplayRecorder
 
 class AISolver:
     """
@@ -10,86 +21,84 @@ class AISolver:
     - Each edge is explored at most twice (grey then black)
     - Uses a backtrack stack to return from dead ends
     - Tracks moves, echoes, and session time
+    Movement and echoes go through a GameSession, so the AI plays by the same
+    rules as the game (including monsters met mid-slide).
+    Agent state is compact: edge marks live in a bytearray indexed by
+    cell * 4 + dir and the backtrack stack is a bytearray of direction codes
+    (dir in DIR_NAMES order), so very large mazes cost a few bytes per cell.
+    With record=True, play() also returns the game's replay log (see replay).
     """
-    def __init__(self, width=10, height=10,difficulty='easy'):
-        # Maze generation
-        self.maze = EchoMaze(width, height,difficulty)
+    def __init__(self, width=10, height=10,difficulty='easy', seed=None, maze=None, record=False):
+        # Maze generation (or a pre-built maze, e.g. from a corpus)
+        self.maze = maze if maze is not None else EchoMaze(width, height,difficulty, seed=seed)
         # self.maze.print()  # comment out for batch
-        self.player_pos = self.maze.start
-        self.edge_state = {}
-        self.backtrack_stack = []
-        self.echo_count = 0
-        self.move_count = 0
-
-    def mark_edge_state(self, pos, direction, state):
-        self.edge_state[(pos, direction)] = state
-        opp = self.maze.OPPOSITE[direction]
-        dx, dy = self.maze.DIRECTIONS[direction]
-        adj = (pos[0] + dx, pos[1] + dy)
-        self.edge_state[(adj, opp)] = state
-
-    def can_traverse(self, pos, direction):
-        idx = self.maze.idx(*pos)
-        if self.maze.cells[idx][direction]:
+        self.recorder = ReplayRecorder(self.maze) if record else None
+        self.session = GameSession(self.maze, self.recorder)
+        self.edge_state = bytearray(self.maze.width * self.maze.height * 4)
+        self.backtrack_stack = bytearray()
+        w = self.maze.width
+        self._step = (-w, w, 1, -1)
+
+    @property
+    def player_pos(self):
+        return self.session.position
+
+    @property
+    def echo_count(self):
+        return self.session.echoes
+
+    @property
+    def move_count(self):
+        # a slide counts as an extra move
+        return self.session.moves + self.session.slides
+
+    def mark_edge_state(self, cell, d, state):
+        """Mark the edge leaving `cell` in direction d, and its reverse, with `state`."""
+        self.edge_state[cell * 4 + d] = state
+        self.edge_state[(cell + self._step[d]) * 4 + (d ^ 1)] = state
+
+    def can_traverse(self, cell, d):
+        if self.maze.grid[cell] & (1 << d):
             return False
-        echoes = self.maze.send_echo(pos, direction)
-        self.echo_count += 1
-        if echoes and echoes[0]['delay'] == 0 and echoes[0]['type'] in ('wall', 'monster'):
+        (event,) = self.session.step(ECHO + d)
+        if event[0] == 'echo' and event[3] == 0 and event[2] in ('wall', 'monster'):
             return False
         return True
 
     def next_move(self):
+        """Direction code of the next edge to take, unvisited edges first; None if stuck."""
+        cell = self.session.pos
+        base = cell * 4
+        edge_state = self.edge_state
         for state in (0, 1):
-            for d in self.maze.DIRECTIONS:
-                if self.edge_state.get((self.player_pos, d), 0) == state and self.can_traverse(self.player_pos, d):
+            for d in range(4):
+                if edge_state[base + d] == state and self.can_traverse(cell, d):
                     return d
         return None
 
-    def traverse_edge(self, direction):
-        pos = self.player_pos
-        curr = self.edge_state.get((pos, direction), 0)
-        new_state = 1 if curr == 0 else 2 if curr == 1 else None
-        if new_state is None:
+    def traverse_edge(self, d):
+        cell = self.session.pos
+        curr = self.edge_state[cell * 4 + d]
+        if curr >= 2:
             return False
-        self.mark_edge_state(pos, direction, new_state)
-        self.backtrack_stack.append(self.maze.OPPOSITE[direction])
-        dx, dy = self.maze.DIRECTIONS[direction]
-        self.player_pos = (pos[0] + dx, pos[1] + dy)
-        self.move_count += 1
-        if self.maze.floor_type[pos[1] + dy][pos[0] + dx] == 'ice':
-            dest = self.maze.slide_dest.get(self.player_pos, {}).get(direction)
-            if dest and dest != self.player_pos:
-                self.player_pos = dest
-                self.move_count += 1
+        self.mark_edge_state(cell, d, curr + 1)
+        self.backtrack_stack.append(d ^ 1)
+        self.session.step(MOVE + d)
         return True
 
     def backtrack(self):
         if not self.backtrack_stack:
             return False
-        direction = self.backtrack_stack.pop()
-        pos = self.player_pos
-        dx, dy = self.maze.DIRECTIONS[direction]
-        self.player_pos = (pos[0] + dx, pos[1] + dy)
-        self.move_count += 1
-        if self.maze.floor_type[pos[1] + dy][pos[0] + dx] == 'ice':
-            dest = self.maze.slide_dest.get(self.player_pos, {}).get(direction)
-            if dest and dest != self.player_pos:
-                self.player_pos = dest
-                self.move_count += 1
-        return True
+        d = self.backtrack_stack.pop()
+        # slides are straight and reversible, so the opposite move retraces them
+        return self.session.step(MOVE + d)[0][0] != 'blocked'
 
     def play(self):
         start = time.time()
-        result = {'found_exit': False, 'hit_monster': False}
-        while True:
-            if self.player_pos == self.maze.end:
-                result['found_exit'] = True
-                break
-            if self.player_pos in self.maze.monsters:
-                result['hit_monster'] = True
-                break
+        session = self.session
+        while not session.over:
             d = self.next_move()
-            if d:
+            if d is not None:
                 self.traverse_edge(d)
             else:
                 if self.backtrack_stack:
@@ -97,49 +106,561 @@ class AISolver:
                 else:
                     break
         end = time.time()
-        result['moves'] = self.move_count
-        result['echoes'] = self.echo_count
-        result['time'] = end - start
-        return result
+        stats = {
+            'found_exit': session.won,
+            'hit_monster': session.dead,
+            'moves': self.move_count,
+            'echoes': self.echo_count,
+            'time': end - start,
+        }
+        if self.recorder is not None:
+            stats['replay'] = self.recorder.finish(session)
+        return stats
 
 
-def run_batch(runs=1000, width=10, height=10, diffculty='easy'):
-    successes = failures = 0
-    total_moves = total_echoes = total_time = total_gen_time = 0.0
+class GuidedSolver(AISolver):
+    """
+    Tremaux with an oracle, for evaluation runs: a baseline of how well an agent
+    that already knew the maze's distance fields would do.
+    - Among edges of the same Tremaux state, takes the one whose far cell is
+      nearest the exit (maze.distance_to_exit)
+    - Knows an edge leads straight into a monster from maze.distance_to_monster,
+      so it never echoes
+    Both fields are built once per maze and read in O(1), so there is no search per step.
+    """
+    def __init__(self, width=10, height=10, difficulty='easy', seed=None, maze=None, record=False):
+        super().__init__(width, height, difficulty, seed=seed, maze=maze, record=record)
+        self.exit_dist = self.maze.distance_to_exit()
+        self.monster_dist = self.maze.distance_to_monster()
 
-    for _ in range(runs):
-        # Measure generation time
-        gen_start = time.time()
-        ai = AISolver(width, height,diffculty)
-        gen_time = time.time() - gen_start
+    def can_traverse(self, cell, d):
+        return not self.maze.grid[cell] & (1 << d) and self.monster_dist[cell + self._step[d]] != 0
+
+    def next_move(self):
+        cell = self.session.pos
+        base = cell * 4
+        edge_state = self.edge_state
+        exit_dist = self.exit_dist
+        best = None
+        for d in range(4):
+            state = edge_state[base + d]
+            if state < 2 and self.can_traverse(cell, d):
+                key = (state, exit_dist[cell + self._step[d]])
+                if best is None or key < best[0]:
+                    best = (key, d)
+        return None if best is None else best[1]
+
+
+# BeliefSolver knowledge: per (cell, dir) edge ...
+UNKNOWN, OPEN, WALL = 0, 1, 2
+# ... and per cell flags
+SAFE, MONSTER_SEEN, ICE_SEEN, VISITED = 1, 2, 4, 8
+
+
+class BeliefSolver:
+    """
+    Map-building AI for EchoMaze:
+    - Keeps a belief map: every (cell, dir) edge is unknown, open or wall, and
+      cells are flagged safe, monster or ice as echoes and moves reveal them
+    - Feels the walls of the cell it stands on, like AISolver (has_wall)
+    - Every echo is fully used: a hit at k steps proves k open edges and k
+      monster-free cells, silence proves three of each
+    - Echoes only towards neighbours it knows nothing about, never a direction
+      it can already answer
+    - Plans with BFS over the known map: to the exit once it has been heard,
+      otherwise to the unvisited neighbour of the most recently visited cell
+      that has one (depth-first order, which walks a tree at most twice)
+    - Learns where ice slides end and plans with those moves afterwards
+    Reports the same play() dict as AISolver (record=True adds the replay log).
+    """
+    def __init__(self, width=10, height=10, difficulty='easy', seed=None, maze=None, record=False):
+        self.maze = maze if maze is not None else EchoMaze(width, height, difficulty, seed=seed)
+        self.recorder = ReplayRecorder(self.maze) if record else None
+        self.session = GameSession(self.maze, self.recorder)
+        w, h = self.maze.width, self.maze.height
+        self.width = w
+        self._step = (-w, w, 1, -1)
+        self.edges = bytearray(w * h * 4)
+        self.flags = bytearray(w * h)
+        # observed slide results {cell * 4 + dir: destination cell}
+        self.transitions = {}
+        self.exit = None
+        # visited cells in visiting order, popped once they have no fresh neighbour
+        self.trail = array('i')
+        # the maze size is known, so the outer walls are too
+        for x in range(w):
+            self.edges[x * 4] = self.edges[((h - 1) * w + x) * 4 + 1] = WALL
+        for y in range(h):
+            self.edges[(y * w + w - 1) * 4 + 2] = self.edges[y * w * 4 + 3] = WALL
+        self.flags[self.session.pos] = SAFE
+
+    @property
+    def player_pos(self):
+        return self.session.position
+
+    @property
+    def echo_count(self):
+        return self.session.echoes
+
+    @property
+    def move_count(self):
+        # a slide counts as an extra move
+        return self.session.moves + self.session.slides
+
+    def _mark(self, cell, d, state):
+        """
+        Record an edge from both of its sides. Outer walls are known from the
+        start, and known edges are skipped, so the far side is always in the maze.
+        """
+        edges = self.edges
+        i = cell * 4 + d
+        if edges[i] != state:
+            edges[i] = state
+            edges[(cell + self._step[d]) * 4 + (d ^ 1)] = state
+
+    def listen(self, d):
+        """Echo in direction d from the current cell and record everything it proves."""
+        cell = self.session.pos
+        (event,) = self.session.step(ECHO + d)
+        if event[0] == 'silence':
+            kind, k = None, 3
+        else:
+            kind, k = event[2], event[3] // 2
+        edges, flags = self.edges, self.flags
+        step = self._step[d]
+        # open edges are written directly: the k cells ahead are all inside the maze
+        back = step * 4 + (d ^ 1) - d
+        for _ in range(k):
+            i = cell * 4 + d
+            edges[i] = edges[i + back] = OPEN
+            cell += step
+            flags[cell] |= SAFE
+        if kind == 'wall':
+            self._mark(cell, d, WALL)
+        elif kind is not None:
+            i = cell * 4 + d
+            edges[i] = edges[i + back] = OPEN
+            cell += step
+            if kind == 'monster':
+                flags[cell] |= MONSTER_SEEN
+            else:
+                self.exit = cell
+                flags[cell] |= SAFE
+
+    def feel(self):
+        """
+        Learn the walls around the current cell, then echo towards every unknown
+        neighbour. Returns what _fresh() would for the cell afterwards, found in
+        the same pass, or None (also for a cell already visited).
+        """
+        cell = self.session.pos
+        flags = self.flags
+        if flags[cell] & VISITED:
+            return None
+        edges, step = self.edges, self._step
+        fresh = None
+        flags[cell] |= SAFE | VISITED
+        self.trail.append(cell)
+        walls = self.maze.grid[cell]
+        base = cell * 4
+        for d in range(4):
+            state = edges[base + d]
+            if state == UNKNOWN:
+                state = WALL if walls >> d & 1 else OPEN
+                edges[base + d] = state
+                edges[(cell + step[d]) * 4 + (d ^ 1)] = state
+            if state == OPEN:
+                seen = flags[cell + step[d]]
+                if not seen:
+                    self.listen(d)
+                    seen = flags[cell + step[d]]
+                # echoes along other directions never reach this neighbour, and no
+                # slide starts from a cell not stood on yet, so the answer is final
+                if fresh is None and seen & SAFE and not seen & (VISITED | MONSTER_SEEN):
+                    fresh = d
+        return fresh
+
+    def plan(self):
+        """
+        Directions of a shortest known route to the exit once it is known and
+        reachable on the map, else to the nearest frontier; None when nothing is left.
+        """
+        if self.exit is not None:
+            path = self._route(self.exit)
+            if path is not None:
+                return path
+        # usual case: a plain step onto an unvisited neighbour, no search needed
+        cell = self.session.pos
+        d = self._fresh(cell)
+        if d is not None:
+            return [d]
+        trail = self.trail
+        while trail:
+            d = self._fresh(trail[-1])
+            if d is None:
+                trail.pop()
+                continue
+            path = self._route(trail[-1])
+            if path is not None:
+                return path + [d]
+            trail.pop()
+        return self._route(None)
+
+    def _fresh(self, cell):
+        """A direction from `cell` onto an unvisited safe cell or an untried slide, or None."""
+        base = cell * 4
+        edges, flags, step = self.edges, self.flags, self._step
+        for d in range(4):
+            if edges[base + d] == OPEN and base + d not in self.transitions:
+                seen = flags[cell + step[d]]
+                if seen & SAFE and not seen & (VISITED | MONSTER_SEEN):
+                    return d
+        return None
+
+    def _route(self, goal):
+        """
+        BFS over known moves from the current cell to `goal`, or with goal=None
+        to the nearest unvisited cell that can be stopped on, or an untried move onto seen ice.
+        """
+        start = self.session.pos
+        edges, flags, transitions, step = self.edges, self.flags, self.transitions, self._step
+        prev = {start: None}
+        queue = deque([start])
+        found = None
+        while queue:
+            cell = queue.popleft()
+            if cell == goal or (goal is None and not flags[cell] & (VISITED | ICE_SEEN)):
+                found = cell
+                break
+            base = cell * 4
+            for d in range(4):
+                if edges[base + d] != OPEN:
+                    continue
+                nxt = transitions.get(base + d)
+                if nxt is None:
+                    nxt = cell + step[d]
+                    seen = flags[nxt]
+                    if seen & ICE_SEEN and not seen & MONSTER_SEEN and goal is None:
+                        # an untried slide is exploration in itself
+                        found = -1 - (base + d)
+                        prev[found] = (cell, d)
+                        break
+                    if seen & (MONSTER_SEEN | ICE_SEEN) or not seen & SAFE:
+                        continue
+                if nxt not in prev:
+                    prev[nxt] = (cell, d)
+                    queue.append(nxt)
+            if found is not None:
+                break
+        if found is None:
+            return None
+        path = []
+        while prev[found] is not None:
+            found, d = prev[found]
+            path.append(d)
+        path.reverse()
+        return path
+
+    def walk(self, path):
+        """Follow planned moves until done, surprised by a slide, or the game ends."""
+        session, flags = self.session, self.flags
+        for d in path:
+            cell = session.pos
+            kind = session.step(MOVE + d)[0][0]
+            if kind == 'monster':
+                return
+            flags[session.pos] |= SAFE
+            if kind == 'slid' and self._slid(cell, d):
+                return
+            if session.over:
+                return
+
+    def _slid(self, cell, d):
+        """
+        Store the slide just taken from `cell` in direction d; True if it was new,
+        after marking the ice it passed over.
+        """
+        # only slides are stored: any other move ends on the next cell
+        i = cell * 4 + d
+        dest = self.session.pos
+        known = i in self.transitions
+        self.transitions[i] = dest
+        if known:
+            return False
+        # every cell passed on the way is ice, the last one is where it stopped
+        flags, step = self.flags, self._step[d]
+        passed = cell + step
+        self._mark(cell, d, OPEN)
+        while passed != dest:
+            flags[passed] |= SAFE | ICE_SEEN
+            self._mark(passed, d, OPEN)
+            passed += step
+        return True
+
+    def play(self):
+        start = time.time()
+        session, flags = self.session, self.flags
+        while not session.over:
+            # usual case: feel() already found an unvisited neighbour, so the step
+            # needs neither plan() nor a second neighbour scan
+            d = self.feel() if not flags[session.pos] & VISITED else None
+            if d is not None and self.exit is None:
+                # walk((d,)) inlined
+                cell = session.pos
+                kind = session.step(MOVE + d)[0][0]
+                if kind != 'monster':
+                    flags[session.pos] |= SAFE
+                    if kind == 'slid':
+                        self._slid(cell, d)
+                continue
+            path = self.plan()
+            if not path:
+                break
+            self.walk(path)
+        end = time.time()
+        stats = {
+            'found_exit': session.won,
+            'hit_monster': session.dead,
+            'moves': self.move_count,
+            'echoes': self.echo_count,
+            'time': end - start,
+        }
+        if self.recorder is not None:
+            stats['replay'] = self.recorder.finish(session)
+        return stats
+
+
+SOLVERS = {
+    'tremaux': AISolver,
+    'belief': BeliefSolver,
+    'guided': GuidedSolver,
+}
 
-        stats = ai.play()
+
+def play_one(job):
+    """
+    Generate and play a single maze; job is (key, width, height, difficulty, seed),
+    optionally followed by profile and a SOLVERS name.
+    """
+    key, width, height, difficulty, seed = job[:5]
+    profile = job[5] if len(job) > 5 else False
+    solver = job[6] if len(job) > 6 else 'tremaux'
+    gen_start = time.time()
+    maze = EchoMaze(width, height, difficulty, seed=seed, profile=profile)
+    ai = SOLVERS[solver](maze=maze)
+    gen_time = time.time() - gen_start
+    stats = ai.play()
+    stats['gen_time'] = gen_time
+    stats['seed'] = seed
+    if profile:
+        stats['gen_stats'] = maze.gen_stats
+    return key, stats
+
+
+_corpora = {}
+
+
+def play_corpus_entry(job):
+    """
+    Load maze number `index` from a corpus file and play it;
+    job is (key, filename, index), optionally followed by a SOLVERS name.
+    """
+    key, filename, index = job[:3]
+    solver = job[3] if len(job) > 3 else 'tremaux'
+    if filename not in _corpora:
+        _corpora[filename] = Corpus(filename)
+    gen_start = time.time()
+    maze = _corpora[filename][index]
+    gen_time = time.time() - gen_start
+    stats = SOLVERS[solver](maze=maze).play()
+    stats['gen_time'] = gen_time
+    stats['seed'] = maze.seed
+    return key, stats
+
+
+BATCH_METRICS = ('moves', 'echoes', 'time', 'gen_time')
+
+
+class BatchSummary:
+    """
+    Streaming aggregate for one (difficulty, width, height) configuration:
+    success counts with a Wilson interval, and a Histogram (mean, p50/p90/p99)
+    per metric in BATCH_METRICS, plus PhaseStats for profiled runs. Memory does not
+    grow with the number of runs.
+    """
+
+    def __init__(self, difficulty):
+        self.difficulty = difficulty
+        self.runs = self.successes = self.failures = 0
+        self.hists = {name: Histogram() for name in BATCH_METRICS}
+        self.gen_stats = PhaseStats()
+
+    def add(self, stats):
+        self.runs += 1
         if stats['found_exit']:
-            successes += 1
+            self.successes += 1
         else:
-            failures += 1
-
-        total_moves += stats['moves']
-        total_echoes += stats['echoes']
-        total_time += stats['time']
-        total_gen_time += gen_time
-
-    print(f"=== {diffculty} Mode Batch ({runs} runs) Summary ===")
-    print(f"Successes: {successes}, Failures: {failures},Success Rate: {successes/runs}")
-    print(f"Avg moves: {total_moves/runs:.2f}")
-    print(f"Avg echoes: {total_echoes/runs:.2f}")
-    print(f"Avg session time: {total_time/runs:.3f}s")
-    print(f"Avg generation time: {total_gen_time/runs:.3f}s")
-
-    return {
-        'runs': runs,
-        'successes': successes,
-        'failures': failures,
-        'avg_moves': total_moves / runs,
-        'avg_echoes': total_echoes / runs,
-        'avg_time': total_time / runs,
-        'avg_gen_time': total_gen_time / runs
-    }
+            self.failures += 1
+        for name, hist in self.hists.items():
+            hist.add(stats[name])
+        self.gen_stats.add(stats.get('gen_stats'))
+
+    def interval(self, z=1.96):
+        """Wilson confidence interval of the success rate so far."""
+        return wilson_interval(self.successes, self.runs, z)
+
+    def converged(self, ci_width, min_runs=100):
+        """True once min_runs are in and the success-rate interval is narrower than ci_width."""
+        if self.runs < min_runs:
+            return False
+        low, high = self.interval()
+        return high - low < ci_width
+
+    def report(self):
+        runs = self.runs
+        low, high = self.interval()
+        hists = self.hists
+        print(f"=== {self.difficulty} Mode Batch ({runs} runs) Summary ===")
+        print(f"Successes: {self.successes}, Failures: {self.failures},Success Rate: {self.successes/runs}"
+              f" (95% CI {low:.3f}-{high:.3f})")
+        for name, label, fmt in (('moves', 'moves', '.2f'), ('echoes', 'echoes', '.2f'),
+                                 ('time', 'session time', '.3f'), ('gen_time', 'generation time', '.3f')):
+            hist = hists[name]
+            unit = 's' if name.endswith('time') else ''
+            print(f"Avg {label}: {hist.mean:{fmt}}{unit} (p50 {hist.percentile(50):{fmt}}{unit}, "
+                  f"p90 {hist.percentile(90):{fmt}}{unit}, p99 {hist.percentile(99):{fmt}}{unit})")
+
+        result = {
+            'runs': runs,
+            'successes': self.successes,
+            'failures': self.failures,
+            'success_rate': self.successes / runs,
+            'success_ci': (low, high),
+            'avg_moves': hists['moves'].mean,
+            'avg_echoes': hists['echoes'].mean,
+            'avg_time': hists['time'].mean,
+            'avg_gen_time': hists['gen_time'].mean,
+            'distributions': {name: hist.summary() for name, hist in hists.items()},
+        }
+        if self.gen_stats:
+            result['phases'] = self.gen_stats.summary()
+            print_summary(result['phases'])
+        return result
+
+
+def _json_line(out, record):
+    """Write one JSON-lines record (bytes such as replay logs are left out)."""
+    out.write(json.dumps({k: v for k, v in record.items() if not isinstance(v, bytes)}) + '\n')
+
+
+def _stream(jobs, workers, chunk_size, play=play_one):
+    """Yield (key, stats) for every job in order, in-process or across a process pool."""
+    if workers <= 1:
+        for job in jobs:
+            yield play(job)
+        return
+    if chunk_size is None:
+        chunk_size = max(1, len(jobs) // (workers * 8))
+    with Pool(workers) as pool:
+        yield from pool.imap(play, jobs, chunksize=chunk_size)
+
+
+def run_batch(runs=1000, width=10, height=10, diffculty='easy', workers=1, chunk_size=None, seed=None,
+              profile=False, solver='tremaux', ci_width=None, min_runs=100, jsonl=None):
+    """
+    Play up to `runs` fresh mazes and print/return the summary (means, percentiles,
+    success rate with its 95% Wilson interval).
+    Run i uses derive_seed(seed, i), so a given seed gives the same mazes and
+    outcomes whatever the number of workers.
+    ci_width stops early, after at least min_runs, once the interval is narrower than
+    ci_width (e.g. 0.02 for +-1%); runs are taken in order, so the stopping point is
+    reproducible too.
+    jsonl is a file name; every run is written as one JSON line, then the summary.
+    profile=True adds a per-phase generation breakdown (see maze_profile) under 'phases'.
+    solver picks the agent from SOLVERS ('tremaux', 'belief' or 'guided').
+    """
+    if seed is None:
+        seed = random.getrandbits(64)
+    jobs = [(i, width, height, diffculty, derive_seed(seed, i), profile, solver) for i in range(runs)]
+    summary = BatchSummary(diffculty)
+    out = open(jsonl, 'w') if jsonl else None
+    try:
+        for i, stats in _stream(jobs, workers, chunk_size):
+            summary.add(stats)
+            if out:
+                _json_line(out, {'run': i, 'difficulty': diffculty, 'width': width, 'height': height,
+                                 'solver': solver, **stats})
+            if ci_width is not None and summary.converged(ci_width, min_runs):
+                break
+        result = summary.report()
+        if out:
+            _json_line(out, {'summary': result, 'difficulty': diffculty, 'width': width, 'height': height,
+                             'solver': solver, 'seed': seed})
+    finally:
+        if out:
+            out.close()
+    return result
+
+
+def run_corpus(filename, runs=None, workers=1, chunk_size=None, solver='tremaux'):
+    """
+    Like run_batch, but replay the first `runs` mazes of a pre-generated corpus
+    (see maze_io) instead of generating them; 'generation' time is load time.
+    """
+    with Corpus(filename) as corpus:
+        total = len(corpus)
+        difficulty = corpus[0].difficulty if total else 'easy'
+    runs = total if runs is None else min(runs, total)
+    jobs = [(None, filename, i, solver) for i in range(runs)]
+    summary = BatchSummary(difficulty)
+    for _, stats in _stream(jobs, workers, chunk_size, play_corpus_entry):
+        summary.add(stats)
+    return summary.report()
+
+
+def run_generated(runs=1000, width=10, height=10, difficulty='easy', seed=None, solver='tremaux',
+                  batch_size=1000):
+    """
+    Like run_batch, but the mazes come from maze_batch.generate_batch, `batch_size`
+    at a time (binary-tree mazes, much faster to build for large Monte-Carlo runs).
+    'generation' time is each maze's share of its batch plus turning it into an EchoMaze.
+    """
+    if seed is None:
+        seed = random.getrandbits(64)
+    summary = BatchSummary(difficulty)
+    for b, first in enumerate(range(0, runs, batch_size)):
+        gen_start = time.time()
+        batch = generate_batch(min(batch_size, runs - first), width, height, difficulty, derive_seed(seed, b))
+        share = (time.time() - gen_start) / len(batch)
+        for i in range(len(batch)):
+            gen_start = time.time()
+            maze = batch.maze(i)
+            gen_time = share + time.time() - gen_start
+            stats = SOLVERS[solver](maze=maze).play()
+            stats['gen_time'] = gen_time
+            summary.add(stats)
+    return summary.report()
+
+
+def run_sweep(configs, runs=1000, workers=1, chunk_size=None, seed=None, profile=False, solver='tremaux'):
+    """
+    Schedule a whole evaluation matrix as one job.
+    configs is a list of (difficulty, width, height); every configuration gets the
+    same per-run seeds as run_batch(runs, width, height, difficulty, seed=seed).
+    Returns {(difficulty, width, height): summary dict}.
+    """
+    if seed is None:
+        seed = random.getrandbits(64)
+    jobs = [(key, key[1], key[2], key[0], derive_seed(seed, i), profile, solver)
+            for key in configs for i in range(runs)]
+    summaries = {key: BatchSummary(key[0]) for key in configs}
+    for key, stats in _stream(jobs, workers, chunk_size):
+        summaries[key].add(stats)
+    results = {}
+    for key in configs:
+        print(f"--- {key[1]}x{key[2]} ---")
+        results[key] = summaries[key].report()
+    return results
 
 if __name__ == '__main__':
     run_batch(100, 10, 10,'easy')
@@ -0,0 +1,96 @@
+import threading
+import time
+import pygame
+
+SOUND_FILES = {
+    'slide': 'sounds/slide.mp3',
+    'thud': 'sounds/thud.mp3',
+    'growl': 'sounds/growl.mp3',
+    'breeze': 'sounds/breeze.mp3',
+    'win': 'sounds/win.mp3',
+    'lose': 'sounds/girl_lose.mp3',
+}
+MUSIC_FILE = 'sounds/creepy_bg.mp3'
+FONT_FILE = 'fonts/Tiny5-Regular.ttf'
+
+
+class Assets:
+    """
+    Lazy game assets:
+    - Nothing is touched until first use; creating an Assets does no I/O
+    - screen() initializes pygame and opens the window once
+    - font(size) and image(path, size) load, convert and scale once, then hit a cache
+    - load_sounds_async() loads every sound on a background thread (e.g. while the
+      start screen is up); play() waits for a sound only if it is not there yet
+    - mark_frame() records time-to-first-frame, measured from `created`
+    """
+    def __init__(self, window_size, caption, created=None):
+        self.window_size = window_size
+        self.caption = caption
+        self.created = time.perf_counter() if created is None else created
+        self.first_frame_ms = None
+        self._screen = None
+        self._fonts = {}
+        self._images = {}
+        self._sounds = {}
+        self._sound_thread = None
+        self._lock = threading.Lock()
+
+    def screen(self):
+        if self._screen is None:
+            pygame.init()
+            self._screen = pygame.display.set_mode(self.window_size)
+            pygame.display.set_caption(self.caption)
+        return self._screen
+
+    def font(self, size):
+        font = self._fonts.get(size)
+        if font is None:
+            pygame.font.init()
+            font = self._fonts[size] = pygame.font.Font(FONT_FILE, size)
+        return font
+
+    def image(self, path, size=None):
+        """Image converted for the display (and scaled to `size`), loaded once."""
+        key = (path, size)
+        image = self._images.get(key)
+        if image is None:
+            self.screen()
+            image = pygame.image.load(path).convert_alpha()
+            if size is not None:
+                image = pygame.transform.scale(image, size)
+            self._images[key] = image
+        return image
+
+    def load_sounds_async(self):
+        """Start loading all sounds and the background music on a daemon thread."""
+        with self._lock:
+            if self._sound_thread is None:
+                self._sound_thread = threading.Thread(target=self._load_sounds, name='assets-sounds', daemon=True)
+                self._sound_thread.start()
+
+    def _load_sounds(self):
+        pygame.mixer.init()
+        for name, path in SOUND_FILES.items():
+            self._sounds[name] = pygame.mixer.Sound(path)
+        pygame.mixer.music.load(MUSIC_FILE)
+        pygame.mixer.music.play(-1)
+
+    def sound(self, name):
+        if name not in self._sounds:
+            self.load_sounds_async()
+            self._sound_thread.join()
+        return self._sounds[name]
+
+    def play(self, name, volume=None):
+        """Play a sound, optionally at a volume (0-1) for this playback only."""
+        channel = self.sound(name).play()
+        if channel is not None and volume is not None:
+            channel.set_volume(volume)
+
+    def mark_frame(self):
+        """Call after a frame is shown; the first call reports time-to-first-frame."""
+        if self.first_frame_ms is None:
+            self.first_frame_ms = (time.perf_counter() - self.created) * 1000
+            print(f"First frame after {self.first_frame_ms:.0f} ms")
+        return self.first_frame_ms
@@ -0,0 +1,322 @@
+"""
+Reproducible benchmark suite with scaling curves and regression gates.
+
+    python benchmarks.py run --out baseline.json           # full suite, 10x10 .. 1000x1000
+    python benchmarks.py run --quick                       # sizes up to 100x100
+    python benchmarks.py compare baseline.json             # re-run and gate against a baseline
+    python benchmarks.py compare baseline.json new.json    # gate two saved runs
+
+Every benchmark builds its mazes from fixed seeds, so two runs time exactly the
+same work. For each (benchmark, size) the suite records the best time per call,
+throughput in the benchmark's own unit (cells, echoes, ...) per second and, with
+tracemalloc, the peak memory of one call. The time/size curve of each benchmark
+is fitted on a log-log scale; the slope is its scaling exponent (1.0 = linear
+in the number of cells). Only the standard library is used.
+"""
+
+import argparse
+import json
+import math
+import platform
+import random
+import sys
+import time
+import tracemalloc
+from ai import SOLVERS
+from echo_maze import EchoMaze
+
+SIZES = (10, 32, 100, 316, 1000)
+QUICK_SIZES = (10, 32, 100)
+SEED = 2025
+PROBES = 10000
+# keep repeating small cases until this much time has been spent
+MIN_TIME = 0.2
+MAX_REPEATS = 50
+THRESHOLD = 0.25
+
+_mazes = {}
+
+
+def base_maze(size, monsters=True):
+    """The shared fixed-seed easy maze of one size, built once per process."""
+    key = (size, monsters)
+    if key not in _mazes:
+        maze = EchoMaze(size, size, 'easy', seed=SEED)
+        if not monsters:
+            maze.monsters = ()
+        _mazes[key] = maze
+    return _mazes[key]
+
+
+def _generate(difficulty):
+    def setup(size):
+        return size
+
+    def run(size):
+        EchoMaze(size, size, difficulty, seed=SEED)
+        return size * size
+    return setup, run
+
+
+def _send_echo():
+    def setup(size):
+        maze = base_maze(size)
+        maze.echo_table()
+        rng = random.Random(SEED)
+        probes = [((rng.randrange(size), rng.randrange(size)), rng.choice(('UP', 'DOWN', 'RIGHT', 'LEFT')))
+                  for _ in range(PROBES)]
+        return maze, probes
+
+    def run(state):
+        maze, probes = state
+        send_echo = maze.send_echo
+        for pos, direction in probes:
+            send_echo(pos, direction)
+        return len(probes)
+    return setup, run
+
+
+def _solve():
+    def setup(size):
+        return base_maze(size)
+
+    def run(maze):
+        maze.solve(maze.start, maze.end)
+        return maze.width * maze.height
+    return setup, run
+
+
+def _extract_graph():
+    def setup(size):
+        return base_maze(size)
+
+    def run(maze):
+        maze.extract_graph()
+        return maze.width * maze.height
+    return setup, run
+
+
+def _slide_precompute():
+    def setup(size):
+        return base_maze(size)
+
+    def run(maze):
+        maze.invalidate()
+        maze.compute_slide_dest()
+        return maze.width * maze.height
+    return setup, run
+
+
+def _ai_play(solver):
+    # without monsters the agent explores until it finds the exit,
+    # so the run length grows with the maze instead of ending at random
+    def setup(size):
+        return base_maze(size, monsters=False)
+
+    def run(maze):
+        stats = SOLVERS[solver](maze=maze).play()
+        return stats['moves'] + stats['echoes']
+    return setup, run
+
+
+# name -> (factory, unit, largest size)
+BENCHMARKS = {
+    'generate_easy': (lambda: _generate('easy'), 'cells', 1000),
+    'generate_medium': (lambda: _generate('medium'), 'cells', 1000),
+    'generate_hard': (lambda: _generate('hard'), 'cells', 1000),
+    'send_echo': (_send_echo, 'echoes', 1000),
+    'solve': (_solve, 'cells', 1000),
+    'extract_graph': (_extract_graph, 'cells', 1000),
+    'slide_precompute': (_slide_precompute, 'cells', 1000),
+    'ai_play': (lambda: _ai_play('tremaux'), 'actions', 1000),
+    'belief_play': (lambda: _ai_play('belief'), 'actions', 1000),
+}
+
+
+def measure(run, state, memory=True):
+    """
+    Best seconds per call, ops per call, peak traced bytes of one extra call,
+    the number of calls timed and their spread: (median - best) / best.
+    """
+    times = []
+    spent = 0.0
+    while len(times) < MAX_REPEATS and (not times or spent < MIN_TIME):
+        start = time.perf_counter()
+        ops = run(state)
+        elapsed = time.perf_counter() - start
+        times.append(elapsed)
+        spent += elapsed
+    times.sort()
+    best = times[0]
+    spread = (times[len(times) // 2] - best) / best if best else 0.0
+    peak = None
+    if memory:
+        tracemalloc.start()
+        run(state)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return best, ops, peak, len(times), spread
+
+
+def scaling_exponent(points):
+    """Least-squares slope of log(seconds) against log(cells) over (size, seconds) points."""
+    points = [(math.log(size * size), math.log(seconds)) for size, seconds in points if seconds > 0]
+    if len(points) < 2:
+        return None
+    n = len(points)
+    mean_x = sum(x for x, _ in points) / n
+    mean_y = sum(y for _, y in points) / n
+    var = sum((x - mean_x) ** 2 for x, _ in points)
+    if not var:
+        return None
+    return sum((x - mean_x) * (y - mean_y) for x, y in points) / var
+
+
+def bench(name, size, memory=True, verbose=True):
+    """Run one benchmark at one size and return its result row."""
+    factory, unit, _ = BENCHMARKS[name]
+    setup, run = factory()
+    seconds, ops, peak, repeats, spread = measure(run, setup(size), memory)
+    if verbose:
+        mem = f"{peak / 1024:10.1f} KiB" if peak is not None else ''
+        print(f"{name:18s} {size:5d}x{size:<5d} {seconds * 1e3:11.3f} ms "
+              f"{ops / seconds:14.0f} {unit}/s {mem}")
+    return {
+        'seconds': seconds,
+        'ops': ops,
+        'throughput': ops / seconds if seconds else None,
+        'peak_bytes': peak,
+        'repeats': repeats,
+        'spread': spread,
+    }
+
+
+def run_suite(sizes=SIZES, names=None, memory=True, verbose=True):
+    """Run the selected benchmarks at every size up to their limit; returns the report dict."""
+    names = list(BENCHMARKS) if names is None else names
+    results = {}
+    exponents = {}
+    for name in names:
+        limit = BENCHMARKS[name][2]
+        rows = {str(size): bench(name, size, memory, verbose) for size in sizes if size <= limit}
+        results[name] = rows
+        exponents[name] = scaling_exponent([(int(size), row['seconds']) for size, row in rows.items()])
+        if verbose and exponents[name] is not None:
+            print(f"{name:18s} scaling exponent {exponents[name]:.2f}")
+    return {
+        'meta': {
+            'python': platform.python_version(),
+            'implementation': platform.python_implementation(),
+            'machine': platform.machine(),
+            'seed': SEED,
+            'sizes': list(sizes),
+            'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        },
+        'units': {name: BENCHMARKS[name][1] for name in names},
+        'results': results,
+        'exponents': exponents,
+    }
+
+
+def compare(baseline, current, threshold=THRESHOLD, verbose=True):
+    """
+    List every (benchmark, size) whose time or peak memory grew by more than
+    `threshold` (0.25 = 25%) over the baseline. Cases missing from either side are skipped.
+    Times get the larger spread of the two runs on top of the threshold, so a case
+    whose own repeats already vary that much is not flagged on noise alone.
+    """
+    regressions = []
+    for name, rows in baseline['results'].items():
+        for size, old in rows.items():
+            new = current['results'].get(name, {}).get(size)
+            if new is None:
+                continue
+            for metric in ('seconds', 'peak_bytes'):
+                if old.get(metric) and new.get(metric) is not None:
+                    ratio = new[metric] / old[metric]
+                    bound = 1 + threshold
+                    if metric == 'seconds':
+                        bound += max(old.get('spread', 0.0), new.get('spread', 0.0))
+                    if ratio > bound:
+                        regressions.append((name, int(size), metric, old[metric], new[metric], ratio))
+    if verbose:
+        for name, size, metric, old, new, ratio in regressions:
+            print(f"REGRESSION {name} {size}x{size} {metric}: {old:.6g} -> {new:.6g} ({ratio:.2f}x)")
+        if not regressions:
+            print(f"No regressions beyond {threshold:.0%}")
+    return regressions
+
+
+def confirm(baseline, report, regressions, threshold=THRESHOLD, memory=True):
+    """
+    Time every regressed case once more and keep the faster result, so a case only
+    fails when both measurements regress. The larger of the two spreads is kept,
+    and widens the bound in compare(). Returns the regressions that remain.
+    """
+    if not regressions:
+        return regressions
+    print(f"Re-measuring {len(regressions)} suspected regression(s)")
+    for name, size in {(name, size) for name, size, *_ in regressions}:
+        old = report['results'][name][str(size)]
+        new = bench(name, size, memory)
+        if new['seconds'] < old['seconds']:
+            old.update(seconds=new['seconds'], throughput=new['throughput'], repeats=new['repeats'])
+        old['spread'] = max(old.get('spread', 0.0), new['spread'])
+        if new['peak_bytes'] is not None and old['peak_bytes'] is not None:
+            old['peak_bytes'] = min(old['peak_bytes'], new['peak_bytes'])
+    return compare(baseline, report, threshold)
+
+
+def save(report, filename):
+    with open(filename, 'w') as f:
+        json.dump(report, f, indent=2)
+
+
+def load(filename):
+    with open(filename) as f:
+        return json.load(f)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Echo maze benchmark suite.')
+    sub = parser.add_subparsers(dest='command', required=True)
+    for command in ('run', 'compare'):
+        p = sub.add_parser(command)
+        p.add_argument('--sizes', type=int, nargs='+', default=None)
+        p.add_argument('--quick', action='store_true', help=f"sizes {QUICK_SIZES}")
+        p.add_argument('--only', nargs='+', choices=list(BENCHMARKS), default=None)
+        p.add_argument('--no-memory', action='store_true', help='skip the tracemalloc pass')
+        if command == 'run':
+            p.add_argument('--out', help='save the report as a JSON baseline')
+        else:
+            p.add_argument('baseline')
+            p.add_argument('current', nargs='?', help='saved report to check; default: run now')
+            p.add_argument('--threshold', type=float, default=THRESHOLD)
+            p.add_argument('--out', help='also save the new report')
+    args = parser.parse_args(argv)
+
+    if args.command == 'compare':
+        baseline = load(args.baseline)
+    if args.command == 'compare' and args.current:
+        report = load(args.current)
+    else:
+        sizes = args.sizes or (QUICK_SIZES if args.quick else SIZES)
+        if args.command == 'compare' and not args.sizes and not args.quick:
+            sizes = baseline['meta']['sizes']
+        names = args.only
+        if args.command == 'compare' and names is None:
+            names = [name for name in baseline['results'] if name in BENCHMARKS]
+        report = run_suite(sizes, names, memory=not args.no_memory)
+    if args.command == 'compare':
+        regressions = compare(baseline, report, args.threshold)
+        if not args.current:
+            regressions = confirm(baseline, report, regressions, args.threshold, not args.no_memory)
+    if args.out:
+        save(report, args.out)
+    if args.command == 'compare':
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,296 @@
+"""
+Chunked world: a maze far bigger than memory, carved lazily chunk by chunk.
+
+The world is chunks_x * chunks_y square chunks of chunk_size cells. A chunk is
+carved the first time it is touched, from a seed mixed out of (world seed, cx, cy),
+so evicting it and carving it again gives exactly the same cells:
+- inside, a perfect maze (maze_gen backtracker), plus loops for medium/hard
+- on every seam with a neighbour, one door whose position depends only on the
+  seam, so both chunks open the same wall without looking at each other
+- monsters (per chunk) never sit on the paths that join the chunk's doors,
+  start and exit, so every chunk can always be crossed and the exit reached
+- ice only on straight corridor cells, never on doors, start or exit
+Resident chunks live in an LRU cache capped at max_chunks.
+
+ChunkedMaze offers the parts of the EchoMaze interface that GameSession and
+run_game use (width/height/start/end, idx, grid, move_table, echo_table,
+has_wall, send_echo). Its tables are views computed per lookup from the cells
+involved, so memory stays constant whatever the world size.
+"""
+
+import random
+from collections import OrderedDict, deque
+from maze_seeds import derive_seed
+from maze_gen import carve_backtracker
+from maze_grid import (DIR_INDEX, WALL_BITS, ICE, MONSTER, OPEN_SIDES,
+                       ECHO_WALL, ECHO_MONSTER, ECHO_EXIT, ECHO_TYPES)
+
+UP, DOWN, RIGHT, LEFT = range(4)
+# cells whose open sides are exactly UP+DOWN or LEFT+RIGHT
+STRAIGHT = frozenset((WALL_BITS & ~0b0011, WALL_BITS & ~0b1100))
+MONSTER_RATIO = 0.2
+ICE_RATIO = 0.3
+EXTRA_PATHS = {'easy': 0, 'medium': 0.02, 'hard': 0.1}
+
+
+class ChunkedMaze:
+    """
+    Lazily generated world of chunk_size x chunk_size chunks.
+    Cells have global coordinates (x, y) and indices y * width + x as in EchoMaze.
+    """
+    DIRECTIONS = {
+        'UP': (0, -1),
+        'DOWN': (0, 1),
+        'RIGHT': (1, 0),
+        'LEFT': (-1, 0)
+    }
+    OPPOSITE = {'UP': 'DOWN', 'DOWN': 'UP', 'RIGHT': 'LEFT', 'LEFT': 'RIGHT'}
+
+    def __init__(self, chunks_x=64, chunks_y=64, chunk_size=16, difficulty='easy', seed=None, max_chunks=64):
+        if difficulty not in EXTRA_PATHS:
+            raise ValueError(f"Unknown difficulty {difficulty!r}")
+        self.chunks_x = chunks_x
+        self.chunks_y = chunks_y
+        self.chunk_size = chunk_size
+        self.width = chunks_x * chunk_size
+        self.height = chunks_y * chunk_size
+        self.difficulty = difficulty
+        self.seed = random.getrandbits(64) if seed is None else seed
+        self.max_chunks = max_chunks
+        self._chunks = OrderedDict()
+        self.generated = 0
+        # start in the top-left chunk, exit in the bottom-right one
+        self.start = self._anchor(0, 0, 1)
+        self.end = self._anchor(chunks_x - 1, chunks_y - 1, 2)
+        self._end = self.idx(*self.end)
+        self.grid = _Cells(self)
+        self._moves = _MoveTable(self)
+
+    def idx(self, x, y):
+        return y * self.width + x
+
+    def in_bounds(self, x, y):
+        return 0 <= x < self.width and 0 <= y < self.height
+
+    # --- chunks -------------------------------------------------------------
+
+    def _mix(self, *keys):
+        seed = self.seed
+        for k in keys:
+            seed = derive_seed(seed, k)
+        return seed
+
+    def _anchor(self, cx, cy, salt):
+        """A fixed cell inside chunk (cx, cy), e.g. for the start or the exit."""
+        rng = random.Random(self._mix(cx, cy, -salt))
+        size = self.chunk_size
+        return (cx * size + rng.randrange(size), cy * size + rng.randrange(size))
+
+    def _door(self, cx, cy, horizontal):
+        """Offset along the seam between chunk (cx, cy) and its right (or lower) neighbour."""
+        return self._mix(cx, cy, -3 - horizontal) % self.chunk_size
+
+    def chunk(self, cx, cy):
+        """Packed grid of chunk (cx, cy), carving it if it is not resident."""
+        key = (cx, cy)
+        chunks = self._chunks
+        grid = chunks.get(key)
+        if grid is not None:
+            chunks.move_to_end(key)
+            return grid
+        grid = self._carve_chunk(cx, cy)
+        chunks[key] = grid
+        self.generated += 1
+        if len(chunks) > self.max_chunks:
+            chunks.popitem(last=False)
+        return grid
+
+    def resident(self):
+        return len(self._chunks)
+
+    def _carve_chunk(self, cx, cy):
+        size = self.chunk_size
+        rng = random.Random(self._mix(cx, cy))
+        grid = bytearray([WALL_BITS]) * (size * size)
+        carve_backtracker(grid, size, size, (0, 0), rng)
+        extra = round(EXTRA_PATHS[self.difficulty] * size * size)
+        for _ in range(extra):
+            x, y = rng.randrange(size - 1), rng.randrange(size - 1)
+            if rng.getrandbits(1):
+                grid[y * size + x] &= ~(1 << RIGHT)
+                grid[y * size + x + 1] &= ~(1 << LEFT)
+            else:
+                grid[y * size + x] &= ~(1 << DOWN)
+                grid[(y + 1) * size + x] &= ~(1 << UP)
+
+        # doors on the seams shared with existing neighbours
+        terminals = []
+        if cx + 1 < self.chunks_x:
+            cell = self._door(cx, cy, 0) * size + size - 1
+            grid[cell] &= ~(1 << RIGHT)
+            terminals.append(cell)
+        if cx > 0:
+            cell = self._door(cx - 1, cy, 0) * size
+            grid[cell] &= ~(1 << LEFT)
+            terminals.append(cell)
+        if cy + 1 < self.chunks_y:
+            cell = (size - 1) * size + self._door(cx, cy, 1)
+            grid[cell] &= ~(1 << DOWN)
+            terminals.append(cell)
+        if cy > 0:
+            cell = self._door(cx, cy - 1, 1)
+            grid[cell] &= ~(1 << UP)
+            terminals.append(cell)
+        for x, y in (self.start, self.end):
+            if x // size == cx and y // size == cy:
+                terminals.append((y % size) * size + x % size)
+
+        protected = self._steiner(grid, size, terminals)
+        free = [c for c in range(size * size) if not protected[c]]
+        for cell in rng.sample(free, int(len(free) * MONSTER_RATIO)):
+            grid[cell] |= MONSTER
+        ends = set(terminals)
+        for cell in range(size * size):
+            if cell not in ends and grid[cell] & WALL_BITS in STRAIGHT and rng.random() < ICE_RATIO:
+                grid[cell] |= ICE
+        return grid
+
+    @staticmethod
+    def _steiner(grid, size, terminals):
+        """Mark the cells on the BFS-tree paths joining all terminals of a chunk."""
+        protected = bytearray(size * size)
+        if not terminals:
+            return protected
+        root = terminals[0]
+        parent = {root: -1}
+        queue = deque([root])
+        steps = (-size, size, 1, -1)
+        while queue:
+            cell = queue.popleft()
+            x = cell % size
+            walls = grid[cell]
+            for d in range(4):
+                if walls & (1 << d):
+                    continue
+                nxt = cell + steps[d]
+                # doors lead out of the chunk
+                if not 0 <= nxt < size * size or (d == RIGHT and x == size - 1) or (d == LEFT and x == 0):
+                    continue
+                if nxt not in parent:
+                    parent[nxt] = cell
+                    queue.append(nxt)
+        for cell in terminals:
+            while cell != -1 and not protected[cell]:
+                protected[cell] = 1
+                cell = parent[cell]
+        return protected
+
+    # --- cells ----------------------------------------------------------------
+
+    def cell(self, i):
+        """Packed byte of global cell i."""
+        size = self.chunk_size
+        x, y = i % self.width, i // self.width
+        return self.chunk(x // size, y // size)[(y % size) * size + x % size]
+
+    def has_wall(self, x, y, direction):
+        return bool(self.cell(self.idx(x, y)) & (1 << DIR_INDEX[direction]))
+
+    def move(self, i):
+        """(dest, hazard) for cell * 4 + dir, with the same rules as EchoMaze.move_table."""
+        cell, d = i >> 2, i & 3
+        if self.cell(cell) & (1 << d):
+            return -1, 0
+        step = (-self.width, self.width, 1, -1)[d]
+        bit = 1 << d
+        nxt = cell + step
+        here = self.cell(nxt)
+        hazard = here & MONSTER
+        while here & ICE and not here & bit:
+            nxt += step
+            here = self.cell(nxt)
+            hazard |= here & MONSTER
+        return nxt, 1 if hazard else 0
+
+    def echo(self, i):
+        """Echo code for cell * 4 + dir, with the same rules as EchoMaze.echo_table."""
+        cell, d = i >> 2, i & 3
+        step = (-self.width, self.width, 1, -1)[d]
+        for k in range(3):
+            if self.cell(cell) & (1 << d):
+                return ECHO_WALL | k << 2
+            cell += step
+            if self.cell(cell) & MONSTER:
+                return ECHO_MONSTER | k << 2
+            if cell == self._end:
+                return ECHO_EXIT | k << 2
+        return 0
+
+    def move_table(self):
+        return self._moves.dest, self._moves.hazard
+
+    def echo_table(self):
+        return _EchoTable(self)
+
+    def send_echo(self, player_pos, direction):
+        code = self.echo(self.idx(*player_pos) * 4 + DIR_INDEX[direction])
+        if not code:
+            return []
+        return [{"type": ECHO_TYPES[code & 3], "delay": (code >> 2) * 2}]
+
+    def open_sides(self, x, y):
+        return OPEN_SIDES[self.cell(self.idx(x, y))]
+
+    def print(self, x0=0, y0=0, w=32, h=16):
+        """Print a window of the world (S start, E exit, M monster, ~ ice)."""
+        for y in range(y0, min(y0 + h, self.height)):
+            row = []
+            for x in range(x0, min(x0 + w, self.width)):
+                b = self.cell(self.idx(x, y))
+                row.append('S' if (x, y) == self.start else 'E' if (x, y) == self.end else
+                           'M' if b & MONSTER else '~' if b & ICE else '.')
+            print(''.join(row))
+
+
+class _Cells:
+    """grid[i] for GameSession, read through the chunk cache."""
+    def __init__(self, world):
+        self.world = world
+
+    def __getitem__(self, i):
+        return self.world.cell(i)
+
+    def __len__(self):
+        return self.world.width * self.world.height
+
+
+class _MoveTable:
+    """dest/hazard views; GameSession reads both for the same move, so the last answer is kept."""
+    def __init__(self, world):
+        self.world = world
+        self._last = (None, None)
+        self.dest = _Lookup(self, 0)
+        self.hazard = _Lookup(self, 1)
+
+    def get(self, i):
+        if self._last[0] != i:
+            self._last = (i, self.world.move(i))
+        return self._last[1]
+
+
+class _Lookup:
+    def __init__(self, table, field):
+        self.table = table
+        self.field = field
+
+    def __getitem__(self, i):
+        return self.table.get(i)[self.field]
+
+
+class _EchoTable:
+    def __init__(self, world):
+        self.world = world
+
+    def __getitem__(self, i):
+        return self.world.echo(i)
+
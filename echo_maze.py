@@ -1,17 +1,40 @@
 import random
 import json
+from array import array
+from bisect import bisect_left, bisect_right
 from collections import deque
+from maze_gen import GENERATORS
+from maze_export import write_ascii
+from maze_profile import PhaseProfiler
+from maze_grid import (DIR_BIT, DIR_INDEX, WALL_BITS, ICE, MONSTER, ICE_TABLE, OPEN_SIDES, OPEN_TABLE, CLEAR_ICE,
+                       MONSTER_TABLE, CLEAR_MONSTER, bernoulli_table,
+                       ECHO_WALL, ECHO_MONSTER, ECHO_EXIT, ECHO_TYPES, CellsView, FloorView, MonsterView,
+                       SlideView)
+
+# Metrics accepted in EchoMaze(targets={name: (low, high)}), see EchoMaze.metrics
+METRICS = ('solution_length', 'branch_points', 'dead_end_ratio', 'path_ice', 'monster_adjacency')
+# the ones already final once the walls are carved and the maze solved
+EARLY_METRICS = ('solution_length', 'branch_points', 'dead_end_ratio')
+# share of the cells off the solution that get a monster
+MONSTER_RATIO = 0.2
+# cells a mutation may search to bridge a cut in the solution before re-solving
+DETOUR_BUDGET = 256
+# cells the endpoint BFS may reach before it stops (once past the minimum distance);
+# mazes up to 512x512 get the full distance field
+ENDPOINT_BUDGET = 1 << 18
 
 
 class EchoMaze:
     """
     EchoMaze：
-      - Generate a connected, acyclic maze (via DFS)
+      - Generate a connected, acyclic maze (DFS by default, see maze_gen.GENERATORS)
       - Random start and end points
       - Place monsters (off the solution path)
       - Optionally includes icy floors (slippery paths)
       - Provides echo-based probe system for blind navigation
       - Supports ASCII rendering & JSON saving
+    Walls, ice and monsters live in one packed byte per cell (`grid`);
+    `cells`, `floor_type` and `monsters` are thin views over it.
     """   
     # Direction vectors and their opposites
     DIRECTIONS = {
@@ -22,66 +45,337 @@ class EchoMaze:
     }
     OPPOSITE = {'UP': 'DOWN', 'DOWN': 'UP', 'RIGHT': 'LEFT', 'LEFT': 'RIGHT'}
 
-    def __init__(self, width=10, height=10, difficulty='easy',monster_count=None):
+    def __init__(self, width=10, height=10, difficulty='easy',monster_count=None, generator='backtracker',
+                 seed=None, profile=False, targets=None, max_restarts=100):
+        if generator not in GENERATORS:
+            raise ValueError(f"Unknown generator {generator!r}; choose from {sorted(GENERATORS)}")
+        if targets is not None:
+            unknown = set(targets) - set(METRICS)
+            if unknown:
+                raise ValueError(f"Unknown metrics {sorted(unknown)}; choose from {list(METRICS)}")
         self.width = width
         self.height = height
         self.difficulty = difficulty
-        # Initialize each cell with walls on all four sides
-        self.cells = [{d: True for d in self.DIRECTIONS} for _ in range(width * height)]
-        # Default floor is non-slippery
-        self.floor_type = [['floor'] * width for _ in range(height)]
-        # Randomly choose a start and end cell (not too close)
-        self.start = random.choice([(x, y) for x in range(self.width) for y in range(self.height)])
-        max_attempts = 100
-        attempts = 0
-        while attempts < max_attempts:
-            self.end = random.choice([(x, y) for x in range(self.width) for y in range(self.height)])
-            distance = abs(self.start[0] - self.end[0]) + abs(self.start[1] - self.end[1])
-            if self.end != self.start and distance >= (self.width + self.height) // 2:
-                break
-            attempts += 1
-        if attempts >= max_attempts:
-            while True:
-                self.end = random.choice([(x, y) for x in range(self.width) for y in range(self.height)])
-                if self.end != self.start:
-                    break
-        # Carve maze via DFS
-        self.dfs_carve(self.start, set())
+        self.generator = generator
+        # Every random choice comes from this seed, so a maze can be rebuilt exactly
+        self.seed = random.getrandbits(64) if seed is None else seed
+        # Lookup tables derived from the grid; dropped by invalidate()
+        self._cache = {}
+        # Per-phase timings and counters when profiling, else gen_stats stays None
+        prof = PhaseProfiler() if profile else None
+        self.gen_stats = None
+        # Generate, score, reject: a rejected maze hands its rng's next draw on as the
+        # seed of the next attempt, so self.seed alone rebuilds the accepted maze
+        self.restarts = 0
+        while not self._generate(monster_count, prof, targets):
+            if self.restarts >= max_restarts:
+                raise ValueError(f"No maze within {targets} after {max_restarts} restarts")
+            self.restarts += 1
+            self.seed = self.rng.getrandbits(64)
+        if prof:
+            if targets is not None:
+                prof.lap('score', restarts=self.restarts)
+            self.gen_stats = prof.result()
+
+    def _generate(self, monster_count, prof, targets):
+        """Build the maze from self.seed; False as soon as it is known to miss the targets."""
+        width, height = self.width, self.height
+        self.rng = random.Random(self.seed)
+        self._cache.clear()
+        # Initialize each cell with walls on all four sides, non-slippery floor
+        self.grid = bytearray([WALL_BITS]) * (width * height)
+        # Random start; the maze is carved from it
+        start = self.rng.randrange(width * height)
+        self.start = (start % width, start // width)
+        # Carve maze with the chosen generator
+        self.carve(self.start)
+        if prof:
+            prof.lap('carve')
         # Optionally add extra paths for higher difficulty
-        if self.difficulty in ['medium', 'hard']:
-            self.add_extra_paths(extra_count=5)
-        # Solve the shortest path for later reference
-        self.solution = self.solve(self.start, self.end)
+        opened = 0
+        if self.difficulty == 'medium':
+            opened = self.add_extra_paths(extra_count=5)
+        elif self.difficulty == 'hard':
+            # more loops, so monsters on the shortest path can be walked around
+            opened = self.add_extra_paths(extra_count=max(10, width * height // 10))
+        if prof:
+            prof.lap('add_extra_paths', walls_opened=opened)
+        # One BFS distance field from the start picks an end that is really
+        # (width + height) // 2 steps away, or the farthest cell if none is;
+        # on large mazes the BFS stops soon after that distance is reached
+        min_dist = (width + height) // 2
+        dist, reached = self._bfs((start,), limit=ENDPOINT_BUDGET, depth=min_dist)
+        end, attempts = self._pick_end(dist, reached, min_dist)
+        self._end = (end % width, end // width)
+        if prof:
+            prof.lap('select_endpoints', endpoint_attempts=attempts)
+        # The same field gives the shortest path
+        self.solution = self._trace(dist, end)
+        if prof:
+            prof.lap('solve', solution_cells=len(self.solution))
+        # The walls are final now; unless hard mode re-routes the solution later,
+        # so are the solution metrics, and a miss skips the costly phases below
+        if targets is not None:
+            early = EARLY_METRICS if self.difficulty != 'hard' else ('dead_end_ratio',)
+            if not self.within(targets, self.metrics(), early):
+                if prof:
+                    prof.lap('score')
+                return False
         # Place monsters strategically
         self.place_monsters(monster_count)
+        if prof:
+            prof.lap('place_monsters')
+            prof.count(monsters=len(self.monsters))
         # Extract linear corridors and assign ice paths
         self.extract_graph()  
+        if prof:
+            prof.lap('extract_graph')
+            prof.count(nodes=len(self.nodes), corridor_pairs=len(self.corridors),
+                       corridor_cells=sum(len(c['cells']) for c in self.corridors))
         self.assign_ice_by_ratio(ratio=0.3)  
-        
+        if prof:
+            prof.lap('assign_ice_by_ratio')
+            prof.count(ice_cells=self.grid.translate(ICE_TABLE).count(1), slide_steps=self._slide_steps())
+        if self.difficulty == 'hard':
+            placed = self.place_path_monsters()
+            if prof:
+                prof.lap('place_path_monsters', path_monsters=placed)
+        return targets is None or self.within(targets, self.metrics())
+
+    def metrics(self):
+        """
+        Difficulty metrics, in one pass over the solution plus one translate of the grid:
+        - solution_length: steps from start to exit along the solution
+        - branch_points: junctions (3+ open sides) the solution passes through
+        - dead_end_ratio: share of cells with a single open side
+        - path_ice: share of solution cells that are ice
+        - monster_adjacency: share of solution cells with a monster one open step away
+        """
+        grid = self.grid
+        width = self.width
+        steps = (-width, width, 1, -1)
+        branches = ice = adjacent = 0
+        for x, y in self.solution:
+            cell = y * width + x
+            b = grid[cell]
+            if OPEN_SIDES[b] >= 3:
+                branches += 1
+            if b & ICE:
+                ice += 1
+            for d in range(4):
+                if not b & (1 << d) and grid[cell + steps[d]] & MONSTER:
+                    adjacent += 1
+                    break
+        cells = len(self.solution) or 1
+        return {
+            'solution_length': len(self.solution) - 1,
+            'branch_points': branches,
+            'dead_end_ratio': grid.translate(OPEN_SIDES).count(1) / len(grid),
+            'path_ice': ice / cells,
+            'monster_adjacency': adjacent / cells,
+        }
+
+    @staticmethod
+    def within(targets, metrics, names=None):
+        """True if every targeted metric (all, or just `names`) lies in its (low, high) range; None is unbounded."""
+        for name, (low, high) in targets.items():
+            if names is not None and name not in names:
+                continue
+            value = metrics[name]
+            if (low is not None and value < low) or (high is not None and value > high):
+                return False
+        return True
+
+    @classmethod
+    def from_grid(cls, width, height, grid, start, end, difficulty='easy', solution=None,
+                  generator='backtracker', seed=None):
+        """
+        Rebuild a maze from a packed grid (walls, ice and monster bits) without
+        generating anything; used by the loaders in maze_io. Only the grid is
+        copied: derived data (graph, tables) is built lazily in _cache.
+        """
+        if len(grid) != width * height:
+            raise ValueError(f"Grid has {len(grid)} cells, expected {width * height}")
+        maze = cls.__new__(cls)
+        maze.width = width
+        maze.height = height
+        maze.difficulty = difficulty
+        maze.generator = generator
+        maze.seed = seed
+        maze.rng = random.Random(seed)
+        maze._cache = {}
+        maze.grid = bytearray(grid)
+        maze.start = tuple(start)
+        maze.end = tuple(end)
+        maze.solution = list(solution) if solution is not None else maze.solve(maze.start, maze.end)
+        # corridors and move/echo tables are built on first use
+        return maze
+
+    def invalidate(self):
+        """Drop lookup tables derived from the grid (call after editing `grid` directly)."""
+        self._cache.clear()
+
+    def _view_changed(self, cell=None):
+        """
+        Called after a write through the cells/floor_type/monsters views: patches
+        the move/echo entries that look through `cell`, or rebuilds them after a
+        bulk write (cell None), in place either way, so a GameSession holding the
+        tables sees the change. Other derived data and the solution are dropped
+        and rebuilt on next use.
+        """
+        cache = self._cache
+        if cell is None:
+            moves, echo = cache.get('move'), cache.get('echo')
+            cache.clear()
+            if moves is not None:
+                dest, hazard = self.move_table()
+                moves[0][:], moves[1][:] = dest, hazard
+                cache['move'] = moves
+            if echo is not None:
+                echo[:] = self.echo_table()
+                cache['echo'] = echo
+        else:
+            self._patch_tables((cell,))
+            for key in ('graph', 'exit_dist', 'monster_dist'):
+                cache.pop(key, None)
+        self._solution = None
+
+    @property
+    def end(self):
+        return self._end
+
+    @end.setter
+    def end(self, pos):
+        self._end = pos
+        self.invalidate()
+
+    @property
+    def solution(self):
+        """
+        Start-to-exit path as (x, y) cells, [end] alone if the exit is cut off.
+        Generation leaves a shortest path. A mutation that cuts or shortcuts it
+        patches it when that is cheap (splice or bridge), which keeps it valid
+        but not always shortest; solve() gives a shortest one. Otherwise it is
+        dropped and solved again on the next read.
+        """
+        if self._solution is None:
+            self._solution = self.solve(self.start, self.end, avoid_monsters=self.difficulty == 'hard')
+        return self._solution
+
+    @solution.setter
+    def solution(self, path):
+        self._solution = path
+
+    @property
+    def cells(self):
+        """Per-cell wall view: cells[idx][direction] is True when walled."""
+        return CellsView(self.grid, self._view_changed)
+
+    @property
+    def floor_type(self):
+        """Floor view: floor_type[y][x] is 'ice' or 'floor'."""
+        return FloorView(self.grid, self.width, self.height, self._view_changed)
+
+    @floor_type.setter
+    def floor_type(self, rows):
+        self.grid[:] = self.grid.translate(CLEAR_ICE)
+        for y, row in enumerate(rows):
+            for x, kind in enumerate(row):
+                if kind == 'ice':
+                    self.grid[y * self.width + x] |= ICE
+        self._view_changed()
+
+    @property
+    def monsters(self):
+        """Set-like view of monster positions."""
+        return MonsterView(self.grid, self.width, self.height, self._view_changed)
+
+    @monsters.setter
+    def monsters(self, positions):
+        positions = set(positions)
+        view = MonsterView(self.grid, self.width, self.height)
+        view.clear()
+        for pos in positions:
+            view.add(pos)
+        self._view_changed()
+
+    def has_wall(self, x, y, direction):
+        """Check whether (x, y) is walled off in the given direction."""
+        return bool(self.grid[y * self.width + x] & DIR_BIT[direction])
+
+    def _carve(self, x, y, direction):
+        """Knock down the wall between (x, y) and its neighbour in direction."""
+        dx, dy = self.DIRECTIONS[direction]
+        self.grid[self.idx(x, y)] &= ~DIR_BIT[direction]
+        self.grid[self.idx(x + dx, y + dy)] &= ~DIR_BIT[self.OPPOSITE[direction]]
+        self.invalidate()
                
     def send_echo(self, player_pos, direction):
         """
        Echo probe: returns echo from up to 3 tiles ahead unless blocked.
        Stops at wall, monster, or exit. Each echo has a delay (distance*2).
+       Constant-time lookup in the precomputed echo table.
        """
-        echoes = []
         x, y = player_pos
-        dx, dy = self.DIRECTIONS[direction]
-        for step in range(1, 4):
-            prev_x, prev_y = x + dx * (step - 1), y + dy * (step - 1)
-            if self.cells[self.idx(prev_x, prev_y)][direction]:
-                echoes.append({"type": "wall", "delay": (step - 1) * 2})
-                break
-            nx, ny = x + dx * step, y + dy * step
-            if not self.in_bounds(nx, ny):
-                break
-            if (nx, ny) in self.monsters:
-                echoes.append({"type": "monster", "delay": (step - 1) * 2})
-                break
-            if (nx, ny) == self.end:
-                echoes.append({"type": "exit", "delay": (step - 1) * 2})
-                break
-        return sorted(echoes, key=lambda e: e['delay'])
+        code = self.echo_table()[(y * self.width + x) * 4 + DIR_INDEX[direction]]
+        if not code:
+            return []
+        return [{"type": ECHO_TYPES[code & 3], "delay": (code >> 2) * 2}]
+
+    def send_echoes(self, positions, directions):
+        """
+        Batched echo probe for many agents at once.
+        directions is one direction for all positions or one per position.
+        Returns a list with (type, delay) per probe, or None where nothing is heard.
+        """
+        table = self.echo_table()
+        width = self.width
+        if isinstance(directions, str):
+            directions = [directions] * len(positions)
+        results = []
+        for (x, y), direction in zip(positions, directions):
+            code = table[(y * width + x) * 4 + DIR_INDEX[direction]]
+            results.append((ECHO_TYPES[code & 3], (code >> 2) * 2) if code else None)
+        return results
+
+    def echo_table(self):
+        """
+        Echo result for every (cell, direction) as one byte at cell*4 + dir:
+        bits 0-1 what is hit (see maze_grid.ECHO_TYPES), bits 2-3 steps beyond the first.
+        Built in one sweep per direction, each cell reusing its neighbour's answer;
+        cached until the maze changes.
+        """
+        table = self._cache.get('echo')
+        if table is not None:
+            return table
+        width, height = self.width, self.height
+        grid = self.grid
+        end = self.idx(*self.end)
+        table = bytearray(width * height * 4)
+        for d, (dx, dy) in enumerate(self.DIRECTIONS.values()):
+            bit = 1 << d
+            step = dy * width + dx
+            # visit cells so that the neighbour in direction d is always done first
+            xs = range(width - 1, -1, -1) if dx > 0 else range(width)
+            ys = range(height - 1, -1, -1) if dy > 0 else range(height)
+            for y in ys:
+                for x in xs:
+                    cell = y * width + x
+                    if grid[cell] & bit:
+                        code = ECHO_WALL
+                    elif not (0 <= x + dx < width and 0 <= y + dy < height):
+                        code = 0
+                    elif grid[cell + step] & MONSTER:
+                        code = ECHO_MONSTER
+                    elif cell + step == end:
+                        code = ECHO_EXIT
+                    else:
+                        # same hit as the neighbour's echo, one step further (max 3 steps)
+                        code = table[(cell + step) * 4 + d]
+                        code = code + 4 if code and code >> 2 < 2 else 0
+                    table[cell * 4 + d] = code
+        self._cache['echo'] = table
+        return table
 
     def idx(self, x, y):
         """Convert (x, y) to 1D index in cells array."""
@@ -91,38 +385,146 @@ class EchoMaze:
         """Check whether (x, y) is inside maze bounds."""
         return 0 <= x < self.width and 0 <= y < self.height
 
-    def dfs_carve(self, pos, visited):
-        """Recursively carve passages using DFS from a given cell."""
-        x, y = pos
-        visited.add(pos)
-        dirs = list(self.DIRECTIONS.items())
-        random.shuffle(dirs)
-        for d, (dx, dy) in dirs:
-            nx, ny = x + dx, y + dy
-            if not self.in_bounds(nx, ny) or (nx, ny) in visited:
-                continue
-            self.cells[self.idx(x, y)][d] = False
-            self.cells[self.idx(nx, ny)][self.OPPOSITE[d]] = False
-            self.dfs_carve((nx, ny), visited)
-
-    def solve(self, start, goal):
-        """Solve the maze using BFS to find the shortest path."""
-        queue = deque([start])
-        prev = {start: None}
-        while queue:
-            x, y = queue.popleft()
-            if (x, y) == goal:
+    def carve(self, pos):
+        """Carve a perfect maze from pos with the configured generator."""
+        GENERATORS[self.generator](self.grid, self.width, self.height, pos, self.rng)
+
+    def dfs_carve(self, pos):
+        """Carve passages with the iterative depth-first backtracker from pos."""
+        GENERATORS['backtracker'](self.grid, self.width, self.height, pos, self.rng)
+
+    def distances(self, sources, avoid_monsters=False):
+        """
+        BFS distance field: steps from the nearest of the source cells (indices)
+        to every cell, -1 where unreachable. Ice is ignored, as in solve().
+        """
+        return self._bfs(sources, avoid_monsters)[0]
+
+    def _bfs(self, sources, avoid_monsters=False, limit=None, depth=0):
+        """
+        distances() plus the reached cells in BFS order. With a limit, the search
+        stops once more than `limit` cells are reached and it is `depth` steps out;
+        cells not reached then stay at -1.
+        """
+        width, grid = self.width, self.grid
+        if limit is None:
+            limit = len(grid)
+        dist = array('i', [-1]) * (width * self.height)
+        queue = array('i', sources)
+        for cell in queue:
+            dist[cell] = 0
+        blocked = MONSTER if avoid_monsters else 0
+        # the queue array grows while it is iterated
+        for cell in queue:
+            if len(queue) > limit and dist[cell] >= depth:
                 break
-            for d, (dx, dy) in self.DIRECTIONS.items():
-                if not self.cells[self.idx(x, y)][d]:
-                    nxt = (x + dx, y + dy)
-                    if nxt not in prev:
-                        prev[nxt] = (x, y)
-                        queue.append(nxt)
-        path, node = [], goal
-        while node:
-            path.append(node)
-            node = prev.get(node)
+            walls = grid[cell]
+            d = dist[cell] + 1
+            if not walls & 1:
+                nxt = cell - width
+                if dist[nxt] < 0 and not grid[nxt] & blocked:
+                    dist[nxt] = d
+                    queue.append(nxt)
+            if not walls & 2:
+                nxt = cell + width
+                if dist[nxt] < 0 and not grid[nxt] & blocked:
+                    dist[nxt] = d
+                    queue.append(nxt)
+            if not walls & 4:
+                nxt = cell + 1
+                if dist[nxt] < 0 and not grid[nxt] & blocked:
+                    dist[nxt] = d
+                    queue.append(nxt)
+            if not walls & 8:
+                nxt = cell - 1
+                if dist[nxt] < 0 and not grid[nxt] & blocked:
+                    dist[nxt] = d
+                    queue.append(nxt)
+        return dist, queue
+
+    def distance_to_exit(self):
+        """
+        Steps from every cell to the exit through open walls (array('i'), cell index).
+        Ice and monsters are ignored, so it never overestimates the walk left.
+        Built with one BFS on first use, cached until the walls or the exit change.
+        """
+        dist = self._cache.get('exit_dist')
+        if dist is None:
+            dist = self._cache['exit_dist'] = self.distances((self.idx(*self.end),))
+        return dist
+
+    def distance_to_monster(self):
+        """
+        Steps from every cell to the nearest monster through open walls (array('i'),
+        -1 where none can be reached). One multi-source BFS, cached like distance_to_exit.
+        """
+        dist = self._cache.get('monster_dist')
+        if dist is None:
+            mask = self.grid.translate(MONSTER_TABLE)
+            sources = []
+            cell = mask.find(1)
+            while cell != -1:
+                sources.append(cell)
+                cell = mask.find(1, cell + 1)
+            dist = self._cache['monster_dist'] = self.distances(sources)
+        return dist
+
+    def _pick_end(self, dist, reached, min_dist, max_attempts=64):
+        """
+        A random cell at least min_dist away in dist, else the farthest; (cell, draws).
+        If the BFS behind dist stopped early, the end is drawn from the far part of
+        `reached` (sorted by distance) rather than from the whole grid.
+        """
+        cells = len(dist)
+        if len(reached) < cells:
+            first = bisect_left(reached, min_dist, key=dist.__getitem__)
+            if first == len(reached):
+                return reached[-1], 0
+            return reached[self.rng.randrange(first, len(reached))], 1
+        for attempt in range(1, max_attempts + 1):
+            cell = self.rng.randrange(cells)
+            if dist[cell] >= min_dist:
+                return cell, attempt
+        return dist.index(max(dist)), max_attempts
+
+    def _trace(self, dist, end):
+        """Shortest path to end down a distance field, as (x, y) from the source."""
+        width, grid = self.width, self.grid
+        steps = (-width, width, 1, -1)
+        cell = end
+        path = [cell]
+        while dist[cell] > 0:
+            walls = grid[cell]
+            for d in range(4):
+                if not walls & (1 << d) and dist[cell + steps[d]] == dist[cell] - 1:
+                    cell += steps[d]
+                    break
+            path.append(cell)
+        return [(c % width, c // width) for c in reversed(path)]
+
+    def solve(self, start, goal, avoid_monsters=False):
+        """Solve the maze using BFS to find the shortest path (ignores ice)."""
+        width, grid = self.width, self.grid
+        source, target = self.idx(*start), self.idx(*goal)
+        steps = (-width, width, 1, -1)
+        prev = {source: None}
+        queue = [source]
+        for cell in queue:
+            if cell == target:
+                break
+            walls = grid[cell]
+            for d in range(4):
+                if not walls & (1 << d):
+                    nxt = cell + steps[d]
+                    if nxt in prev or (avoid_monsters and grid[nxt] & MONSTER):
+                        continue
+                    prev[nxt] = cell
+                    queue.append(nxt)
+        # unreachable goals give [goal], as before
+        path, cell = [], target
+        while cell is not None:
+            path.append((cell % width, cell // width))
+            cell = prev.get(cell)
         return path[::-1]
 
     def add_extra_paths(self, extra_count=5):
@@ -131,50 +533,519 @@ class EchoMaze:
         attempts = 0
         max_attempts = extra_count * 10
         while added < extra_count and attempts < max_attempts:
-            x = random.randint(0, self.width - 1)
-            y = random.randint(0, self.height - 1)
-            dir, (dx, dy) = random.choice(list(self.DIRECTIONS.items()))
+            x = self.rng.randint(0, self.width - 1)
+            y = self.rng.randint(0, self.height - 1)
+            dir, (dx, dy) = self.rng.choice(list(self.DIRECTIONS.items()))
             nx, ny = x + dx, y + dy
             if self.in_bounds(nx, ny):
-                if self.cells[self.idx(x, y)][dir]:
-                    self.cells[self.idx(x, y)][dir] = False
-                    self.cells[self.idx(nx, ny)][self.OPPOSITE[dir]] = False
+                if self.grid[self.idx(x, y)] & DIR_BIT[dir]:
+                    self._carve(x, y, dir)
                     added += 1
             attempts += 1
+        return added
 
     def place_monsters(self, count=None):
         """
-        Place monsters off the solution path.
-        'easy'/'medium' place them only on non-path cells.
-        'hard' could include path cells (currently commented).
+        Place monsters off the solution path: `count` of them, or 20% of the
+        free cells by default. 'hard' also blocks some path cells later, see
+        place_path_monsters.
+        A Bernoulli mask is drawn for every cell at once from random bytes, the
+        solution is masked out with big-integer AND, and a few random flips fix
+        the count exactly, so no coordinates are built.
         """
-        all_cells = {(x, y) for x in range(self.width) for y in range(self.height)}
-        solution_set = set(self.solution)
-        non_solution_cells = list(all_cells - solution_set)
-        max_monsters = int(len(non_solution_cells) * 0.2)
-        monsters = set()
-
-        if self.difficulty == 'easy':
-            monsters.update(random.sample(non_solution_cells, max_monsters))
-
-        elif self.difficulty == 'medium':
-            monsters.update(random.sample(non_solution_cells, max_monsters))
+        cells = self.width * self.height
+        width = self.width
+        exclude = bytearray(cells)
+        for x, y in self.solution:
+            exclude[y * width + x] = 1
+        free = cells - exclude.count(1)
+        wanted = int(free * MONSTER_RATIO) if count is None else max(0, min(count, free))
+        rng = self.rng
+        rate = bernoulli_table(wanted / free if free else 0)
+        mask = rng.randbytes(cells).translate(rate)
+        mask = bytearray((int.from_bytes(mask, 'big') & ~int.from_bytes(exclude, 'big')).to_bytes(cells, 'big'))
+        have = mask.count(1)
+        while have > wanted:
+            cell = rng.randrange(cells)
+            if mask[cell]:
+                mask[cell] = 0
+                have -= 1
+        while have < wanted:
+            cell = rng.randrange(cells)
+            if not mask[cell] and not exclude[cell]:
+                mask[cell] = 1
+                have += 1
+        grid = self.grid.translate(CLEAR_MONSTER)
+        self.grid[:] = (int.from_bytes(grid, 'big') | int.from_bytes(mask, 'big') << 5).to_bytes(cells, 'big')
+        self.invalidate()
 
-        # elif self.difficulty == 'hard':
-        #
-        #     path_cells = list(solution_set - {self.start, self.end})
-        #     extra_on_path = max(1, int(len(path_cells) * 0.1))
-        #     monsters.update(random.sample(non_solution_cells, max_monsters))
-        #     monsters.update(random.sample(path_cells, extra_on_path))
+    def place_path_monsters(self, ratio=0.1):
+        """
+        'hard': put monsters on ~10% of the solution cells, keeping only those
+        that leave the maze solvable under ice and monsters. The solution is
+        then re-routed around them.
+        Each candidate only patches the table entries that look through its
+        cell, and the maze is only searched again when the monster lands on
+        the moves of the current ice-aware route.
+        """
+        path_cells = [c for c in self.solution if c not in (self.start, self.end)]
+        wanted = max(1, int(len(path_cells) * ratio))
+        self.rng.shuffle(path_cells)
+        grid = self.grid
+        hazard = self.move_table()[1]
+        route = self._route_moves(self.solve_ice(self.start, self.end))
+        placed = 0
+        for x, y in path_cells[:wanted * 4]:
+            cell = y * self.width + x
+            grid[cell] |= MONSTER
+            self._patch_tables((cell,))
+            if not any(hazard[i] for i in route):
+                placed += 1
+            else:
+                detour = self.solve_ice(self.start, self.end)
+                if detour:
+                    route = self._route_moves(detour)
+                    placed += 1
+                else:
+                    grid[cell] &= ~MONSTER
+                    self._patch_tables((cell,))
+            if placed == wanted:
+                break
+        self._cache.pop('monster_dist', None)
+        self.solution = self.solve(self.start, self.end, avoid_monsters=True)
+        return placed
 
-        self.monsters = monsters
+    def _route_moves(self, route):
+        """Move table indices (cell * 4 + dir) taken between the stops of a solve_ice route."""
+        dest = self.move_table()[0]
+        width = self.width
+        moves = []
+        for (ax, ay), (bx, by) in zip(route, route[1:]):
+            base = (ay * width + ax) * 4
+            target = by * width + bx
+            moves.append(next(base + d for d in range(4) if dest[base + d] == target))
+        return moves
 
     def extract_graph(self):
         """
         Extract nodes (degree != 2) and corridors (straight paths).
         Used to determine which areas may be converted into ice.
+        Every row and column is swept once, so the cost is
+        O(width * height + corridors) instead of testing all node pairs.
+        The per-line corridor index is kept, so the mutation methods can
+        re-sweep just the stretch of a row or column around a change.
+        Everything lives in _cache['graph'], so nodes/corridors are rebuilt on
+        first use after invalidate().
+        """
+        width, height = self.width, self.height
+        opened = self.grid.translate(OPEN_TABLE)
+        is_node = bytearray(width * height)
+        nodes, node_cells = [], array('i')
+        for y in range(height):
+            row = y * width
+            for x in range(width):
+                i = row + x
+                if not opened[i]:
+                    continue
+                deg = ((y > 0 and opened[i - width]) + (y < height - 1 and opened[i + width])
+                       + (x < width - 1 and opened[i + 1]) + (x > 0 and opened[i - 1]))
+                if deg != 2 or (x, y) in (self.start, self.end):
+                    is_node[i] = 1
+                    nodes.append((x, y))
+                    node_cells.append(i)
+        # [node flags, row corridor index, column corridor index, flat lists (see _graph_lists)]
+        state = self._cache['graph'] = [is_node, {}, {}, None]
+
+        # A corridor joins two nodes on one line when every wall between them
+        # is open and every cell strictly between them has exactly two open
+        # sides. Corridors are indexed by their first node, per direction.
+        for y in range(height):
+            self._sweep_line(0, y, 0, width - 1)
+        for x in range(width):
+            self._sweep_line(1, x, 0, height - 1)
+
+        # Same order as the pairwise scan: per node, row partners then column partners
+        corridors, keys = [], array('q')
+        for i in node_cells:
+            for along, index in ((0, state[1]), (1, state[2])):
+                line = index.get(i, ())
+                corridors.extend(line)
+                keys.extend([i * 2 + along] * len(line))
+        state[3] = (nodes, corridors, node_cells, keys)
+
+    def _graph_state(self):
+        state = self._cache.get('graph')
+        if state is None:
+            self.extract_graph()
+            state = self._cache['graph']
+        return state
+
+    @property
+    def _is_node(self):
+        return self._graph_state()[0]
+
+    @property
+    def _across(self):
+        return self._graph_state()[1]
+
+    @property
+    def _down(self):
+        return self._graph_state()[2]
+
+    def _sweep_line(self, along, line, lo, hi):
+        """
+        (Re)build the corridors starting between positions lo and hi - 1 of row
+        `line` (along=0) or column `line` (along=1); `run` holds the nodes that
+        can still reach the current cell.
+        """
+        width, grid, is_node = self.width, self.grid, self._is_node
+        if along:
+            base, step, wall, index = line, width, DIR_BIT['DOWN'], self._down
+        else:
+            base, step, wall, index = line * width, 1, DIR_BIT['RIGHT'], self._across
+        for p in range(lo, hi):
+            index.pop(base + p * step, None)
+        run = []
+        for p in range(lo, hi + 1):
+            i = base + p * step
+            if is_node[i]:
+                for a in run:
+                    if along:
+                        corridor = {'nodes': ((line, a), (line, p)), 'cells': [(line, c) for c in range(a + 1, p)]}
+                    else:
+                        corridor = {'nodes': ((a, line), (p, line)), 'cells': [(c, line) for c in range(a + 1, p)]}
+                    index.setdefault(base + a * step, []).append(corridor)
+            if p == hi or grid[i] & wall:
+                run = []
+                continue
+            if OPEN_SIDES[grid[i]] != 2:
+                run = []
+            if is_node[i]:
+                run.append(p)
+
+    @property
+    def nodes(self):
+        """Cells with degree != 2 (plus start and exit), row by row."""
+        return self._graph_lists()[0]
+
+    @property
+    def corridors(self):
+        """Straight corridors as {'nodes': (a, b), 'cells': [cells strictly between]}."""
+        return self._graph_lists()[1]
+
+    def _graph_lists(self):
         """
-        self.nodes = []
+        (nodes, corridors, node cells, corridor keys). The sorted node cell
+        indices and corridor keys (cell * 2 + along) let the mutation methods
+        find the slice of either list that belongs to one node and patch it in place.
+        """
+        return self._graph_state()[3]
+
+    # --- mutation -------------------------------------------------------------
+    # Each call edits the grid and patches the derived data in place: move and
+    # echo table entries whose line of sight runs through the changed cells,
+    # node flags of those cells and their neighbours, the corridors of the
+    # row/column stretches around them (in the index and the flat node and
+    # corridor lists), and the solution only if it was cut or shortcut; one
+    # that cannot be patched cheaply is dropped and solved again on next read.
+    # Distance fields are dropped and rebuilt on the next request.
+    # Tables are patched rather than rebuilt, so a GameSession already holding
+    # them sees the change at once.
+
+    def open_wall(self, x, y, direction):
+        """Knock down the wall between (x, y) and its neighbour; False if it was already open."""
+        return self._set_wall(x, y, direction, False)
+
+    def close_wall(self, x, y, direction):
+        """Put up the wall between (x, y) and its neighbour; False if it was already there."""
+        return self._set_wall(x, y, direction, True)
+
+    def move_monster(self, src, dst):
+        """Move the monster at src to the free cell dst (never the start or exit)."""
+        a, b = self.idx(*src), self.idx(*dst)
+        if not self.grid[a] & MONSTER:
+            raise ValueError(f"No monster at {src}")
+        if self.grid[b] & MONSTER or tuple(dst) in (self.start, self.end):
+            raise ValueError(f"Cannot move a monster onto {dst}")
+        self.grid[a] &= ~MONSTER
+        self.grid[b] |= MONSTER
+        self._patch_tables((a, b))
+        self._cache.pop('monster_dist', None)
+        # hard mode routes its solution around monsters
+        solution = self._solution
+        if self.difficulty == 'hard' and solution is not None and (
+                solution[0] != self.start or b in self._path_index()):
+            self._solution = None
+
+    def set_ice(self, x, y, ice=True):
+        """Turn (x, y) into ice (or back into floor); the start and exit never get ice."""
+        if ice and (x, y) in (self.start, self.end):
+            raise ValueError("The start and exit cannot be ice")
+        cell = self.idx(x, y)
+        if bool(self.grid[cell] & ICE) == ice:
+            return False
+        self.grid[cell] ^= ICE
+        self._patch_tables((cell,))
+        return True
+
+    def _set_wall(self, x, y, direction, closed):
+        dx, dy = self.DIRECTIONS[direction]
+        if not (self.in_bounds(x, y) and self.in_bounds(x + dx, y + dy)):
+            raise ValueError(f"No inner wall {direction} of {(x, y)}")
+        grid = self.grid
+        a, b = self.idx(x, y), self.idx(x + dx, y + dy)
+        bit, back = DIR_BIT[direction], DIR_BIT[self.OPPOSITE[direction]]
+        if bool(grid[a] & bit) == closed:
+            return False
+        # cells whose node flag flips (only when a cell gets fully walled in or
+        # opens up) need their lines re-swept too; find them on the new grid
+        grid[a] ^= bit
+        grid[b] ^= back
+        flags = {i: self._node_flag(i) for i in self._around((a, b))}
+        grid[a] ^= bit
+        grid[b] ^= back
+        is_node = self._is_node
+        touched = {a, b}.union(i for i, flag in flags.items() if flag != is_node[i])
+        windows = self._line_windows(touched)
+        grid[a] ^= bit
+        grid[b] ^= back
+        self._patch_graph(touched, flags, windows)
+        # only lines of sight along this wall's axis go through it
+        axis = {DIR_INDEX[direction], DIR_INDEX[self.OPPOSITE[direction]]}
+        self._patch_tables((a, b), axis)
+        self._cache.pop('exit_dist', None)
+        self._cache.pop('monster_dist', None)
+        solution = self._solution
+        if solution is None:
+            return True
+        if solution[0] != self.start:
+            # the exit was cut off; an opened wall may have reconnected it
+            if not closed:
+                self._solution = None
+            return True
+        path = self._path_index()
+        if a in path and b in path:
+            i, j = sorted((path[a], path[b]))
+            if closed and j - i == 1:
+                # None (re-solve on read) if no bridge is found nearby
+                self._solution = self._detour(i)
+            elif not closed and j - i > 1:
+                # a shortcut between two route cells: splice it in
+                self._solution = solution[:i + 1] + solution[j:]
+        return True
+
+    def _around(self, cells):
+        """The cells plus their in-bounds neighbours (whose node flags may change)."""
+        width, height = self.width, self.height
+        near = set(cells)
+        for cell in cells:
+            x, y = cell % width, cell // width
+            if y > 0:
+                near.add(cell - width)
+            if y < height - 1:
+                near.add(cell + width)
+            if x < width - 1:
+                near.add(cell + 1)
+            if x > 0:
+                near.add(cell - 1)
+        return near
+
+    def _line_windows(self, cells, windows=None):
+        """
+        Per row/column, the stretch [lo, hi] holding every corridor that can pass
+        through one of the cells: out to the nearest closed wall or cell that
+        does not have exactly two open sides, where runs stop.
+        """
+        width, height, grid = self.width, self.height, self.grid
+        windows = {} if windows is None else windows
+        for cell in cells:
+            for along, step, wall, pos, limit, line in (
+                    (0, 1, DIR_BIT['RIGHT'], cell % width, width, cell // width),
+                    (1, width, DIR_BIT['DOWN'], cell // width, height, cell % width)):
+                lo, c = pos, cell
+                while lo > 0 and not grid[c - step] & wall:
+                    lo -= 1
+                    c -= step
+                    if OPEN_SIDES[grid[c]] != 2:
+                        break
+                hi, c = pos, cell
+                while hi < limit - 1 and not grid[c] & wall:
+                    hi += 1
+                    c += step
+                    if OPEN_SIDES[grid[c]] != 2:
+                        break
+                key = (along, line)
+                if key in windows:
+                    old_lo, old_hi = windows[key]
+                    lo, hi = min(lo, old_lo), max(hi, old_hi)
+                windows[key] = (lo, hi)
+        return windows
+
+    def _node_flag(self, i):
+        """1 if cell i is a node for extract_graph on the current grid."""
+        width, height, grid = self.width, self.height, self.grid
+        if grid[i] & WALL_BITS == WALL_BITS:
+            return 0
+        x, y = i % width, i // width
+        deg = ((y > 0 and OPEN_TABLE[grid[i - width]]) + (y < height - 1 and OPEN_TABLE[grid[i + width]])
+               + (x < width - 1 and OPEN_TABLE[grid[i + 1]]) + (x > 0 and OPEN_TABLE[grid[i - 1]]))
+        return 1 if deg != 2 or (x, y) in (self.start, self.end) else 0
+
+    def _patch_graph(self, touched, flags, windows):
+        """
+        Store the new node flags and re-sweep the stretches around the touched
+        cells; the flat node and corridor lists get the same edits.
+        """
+        state = self._graph_state()
+        is_node = state[0]
+        nodes, corridors, node_cells, keys = state[3]
+        width = self.width
+        for i, flag in flags.items():
+            if flag == is_node[i]:
+                continue
+            is_node[i] = flag
+            k = bisect_left(node_cells, i)
+            if flag:
+                node_cells.insert(k, i)
+                nodes.insert(k, (i % width, i // width))
+            else:
+                del node_cells[k]
+                del nodes[k]
+        self._line_windows(touched, windows)
+        for (along, line), (lo, hi) in windows.items():
+            self._sweep_line(along, line, lo, hi)
+            # swap in the re-swept corridors of every start cell in the stretch
+            base, step, index = (line, width, state[2]) if along else (line * width, 1, state[1])
+            for p in range(lo, hi):
+                cell = base + p * step
+                key = cell * 2 + along
+                first = bisect_left(keys, key)
+                last = bisect_right(keys, key, first)
+                new = index.get(cell, ())
+                if new or last > first:
+                    corridors[first:last] = new
+                    keys[first:last] = array('q', [key]) * len(new)
+
+    def _patch_tables(self, cells, dirs=range(4)):
+        """Recompute the cached move/echo entries in `dirs` that look through any of the cells."""
+        moves = self._cache.get('move')
+        echo = self._cache.get('echo')
+        if moves is None and echo is None:
+            return
+        width, height, grid = self.width, self.height, self.grid
+        end = self.idx(*self.end)
+        for cell in cells:
+            x, y = cell % width, cell // width
+            for d, (dx, dy) in enumerate(self.DIRECTIONS.values()):
+                if d not in dirs:
+                    continue
+                bit = 1 << d
+                step = dy * width + dx
+                if moves is not None:
+                    # moves from cells behind that enter this one, directly or by sliding over ice
+                    dest, hazard = moves
+                    px, py, p = x, y, cell
+                    while True:
+                        self._patch_move(p, d, dx, dy, dest, hazard)
+                        px, py, p = px - dx, py - dy, p - step
+                        if not (0 <= px < width and 0 <= py < height):
+                            break
+                        if p != cell - step and (not grid[p + step] & ICE or grid[p + step] & bit):
+                            break
+                if echo is not None:
+                    # echoes reach three cells ahead
+                    px, py, p = x, y, cell
+                    for _ in range(4):
+                        if not (0 <= px < width and 0 <= py < height):
+                            break
+                        code = 0
+                        c, cx, cy = p, px, py
+                        for k in range(3):
+                            if grid[c] & bit:
+                                code = ECHO_WALL | k << 2
+                                break
+                            cx, cy = cx + dx, cy + dy
+                            if not (0 <= cx < width and 0 <= cy < height):
+                                break
+                            c += step
+                            if grid[c] & MONSTER:
+                                code = ECHO_MONSTER | k << 2
+                                break
+                            if c == end:
+                                code = ECHO_EXIT | k << 2
+                                break
+                        echo[p * 4 + d] = code
+                        px, py, p = px - dx, py - dy, p - step
+
+    def _patch_move(self, cell, d, dx, dy, dest, hazard):
+        """One move table entry, walked out like move_table builds it."""
+        i = cell * 4 + d
+        grid = self.grid
+        bit = 1 << d
+        if grid[cell] & bit:
+            dest[i] = -1
+            hazard[i] = 0
+            return
+        width, height = self.width, self.height
+        step = dy * width + dx
+        nxt = cell + step
+        x, y = nxt % width, nxt // width
+        danger = grid[nxt] & MONSTER
+        while grid[nxt] & ICE and not grid[nxt] & bit and 0 <= x + dx < width and 0 <= y + dy < height:
+            nxt += step
+            x, y = x + dx, y + dy
+            danger |= grid[nxt] & MONSTER
+        dest[i] = nxt
+        hazard[i] = 1 if danger else 0
+
+    def _detour(self, i, budget=DETOUR_BUDGET):
+        """
+        The solution with its cut edge i -> i + 1 bridged: BFS from cell i, at most
+        `budget` cells, to the nearest later solution cell. None if none is found.
+        """
+        width, grid = self.width, self.grid
+        path = self._path_index()
+        avoid = self.difficulty == 'hard'
+        steps = (-width, width, 1, -1)
+        source = self.idx(*self.solution[i])
+        prev = {source: None}
+        queue = [source]
+        for cell in queue:
+            if len(prev) > budget:
+                return None
+            k = path.get(cell, -1)
+            if k > i:
+                detour = []
+                while cell is not None:
+                    detour.append((cell % width, cell // width))
+                    cell = prev[cell]
+                return self.solution[:i] + detour[::-1] + self.solution[k + 1:]
+            walls = grid[cell]
+            for d in range(4):
+                if not walls & (1 << d):
+                    nxt = cell + steps[d]
+                    # never back through the part of the route already walked
+                    if nxt in prev or path.get(nxt, i) < i or (avoid and grid[nxt] & MONSTER):
+                        continue
+                    prev[nxt] = cell
+                    queue.append(nxt)
+        return None
+
+    def _path_index(self):
+        """{cell: position on the solution}, built once per solution."""
+        solution, index = self._cache.get('path', (None, None))
+        if solution is not self.solution:
+            width = self.width
+            index = {y * width + x: k for k, (x, y) in enumerate(self.solution)}
+            self._cache['path'] = (self.solution, index)
+        return index
+
+    def _extract_graph_pairwise(self):
+        """
+        Reference O(nodes^2) corridor scan kept to cross-check extract_graph.
+        Returns (nodes, corridors) without touching the maze.
+        """
+        nodes = []
         for y in range(self.height):
             for x in range(self.width):
                 if self.is_open(x, y):
@@ -183,20 +1054,20 @@ class EchoMaze:
                         for dx,dy in self.DIRECTIONS.values()
                     )
                     if deg != 2 or (x,y) in (self.start, self.end):
-                        self.nodes.append((x, y))
-        self.corridors = []
-        for i, a in enumerate(self.nodes):
-            for b in self.nodes[i+1:]:
+                        nodes.append((x, y))
+        corridors = []
+        for i, a in enumerate(nodes):
+            for b in nodes[i+1:]:
                 if (a[0] == b[0] or a[1] == b[1]) and self.clear_path(a, b):
                     cells = self.cells_between(a, b)
-                    self.corridors.append({'nodes': (a, b), 'cells': cells})
-                    
+                    corridors.append({'nodes': (a, b), 'cells': cells})
+        return nodes, corridors
+
     def is_open(self, x, y):
         """Check if a cell is walkable (has any wall broken)."""
         if not self.in_bounds(x, y):
             return False
-        idx = self.idx(x, y)
-        return any(not self.cells[idx][d] for d in self.DIRECTIONS)
+        return self.grid[self.idx(x, y)] & WALL_BITS != WALL_BITS
 
     def clear_path(self, a, b):
         """
@@ -207,24 +1078,20 @@ class EchoMaze:
             step = 1 if y2 > y1 else -1
             for y in range(y1, y2, step):
                 dir_wall = 'DOWN' if step == 1 else 'UP'
-                if self.cells[self.idx(x1, y)][dir_wall]:
+                if self.grid[self.idx(x1, y)] & DIR_BIT[dir_wall]:
                     return False
             for y in range(y1 + step, y2, step):
-                idx = self.idx(x1, y)
-                deg = sum(not self.cells[idx][d] for d in self.DIRECTIONS)
-                if deg != 2:
+                if OPEN_SIDES[self.grid[self.idx(x1, y)]] != 2:
                     return False
             return True
         if y1 == y2:
             step = 1 if x2 > x1 else -1
             for x in range(x1, x2, step):
                 dir_wall = 'RIGHT' if step == 1 else 'LEFT'
-                if self.cells[self.idx(x, y1)][dir_wall]:
+                if self.grid[self.idx(x, y1)] & DIR_BIT[dir_wall]:
                     return False
             for x in range(x1 + step, x2, step):
-                idx = self.idx(x, y1)
-                deg = sum(not self.cells[idx][d] for d in self.DIRECTIONS)
-                if deg != 2:
+                if OPEN_SIDES[self.grid[self.idx(x, y1)]] != 2:
                     return False
             return True
         return False
@@ -249,17 +1116,130 @@ class EchoMaze:
         Randomly convert ~30% of corridors into slippery ice sections.
         """
         candidates = self.corridors[:]  
+        if not candidates:
+            # too small a maze to have any corridor (e.g. 2x2): nothing to ice
+            return
         total = len(candidates)
         count = max(1, round(total * ratio))
-        ice_corridors = random.sample(candidates, count)
-        self.floor_type = [['floor'] * self.width for _ in range(self.height)]
+        ice_corridors = self.rng.sample(candidates, count)
+        grid = self.grid
+        grid[:] = grid.translate(CLEAR_ICE)
+        ends = (self.start, self.end)
         for corridor in ice_corridors:
             for x, y in corridor['cells']:
-                self.floor_type[y][x] = 'ice'
-        self.slide_dest = {n: {} for n in self.nodes}
-        for node in self.nodes:
-            for d, (dx, dy) in self.DIRECTIONS.items():
-                self.slide_dest[node][d] = self.simulate_slide(node, dx, dy)
+                # never ice the start or exit: a slide would carry the player past it
+                if (x, y) not in ends:
+                    grid[y * self.width + x] |= ICE
+        self.invalidate()
+        self.compute_slide_dest()
+
+    def compute_slide_dest(self):
+        """Precompute where a move from every cell ends in every direction."""
+        self.move_table()
+
+    @property
+    def slide_dest(self):
+        """slide_dest[(x, y)][direction]: end of a move/slide from (x, y), None if walled."""
+        return SlideView(self.move_table()[0], self.width, self.height)
+
+    def move_table(self):
+        """
+        Transition table for every (cell, direction), indexed by cell*4 + dir:
+          dest[i]   cell where a move ends once any ice slide is done, -1 if walled
+          hazard[i] 1 if a monster sits on any cell entered by that move
+        Stepping onto ice keeps going in the same direction until non-ice floor
+        or a wall. Built with one sweep per direction; cached until the maze changes.
+        """
+        tables = self._cache.get('move')
+        if tables is not None:
+            return tables
+        width, height = self.width, self.height
+        grid = self.grid
+        cells = width * height
+        dest = array('i', [-1]) * (cells * 4)
+        hazard = bytearray(cells * 4)
+        # where a slide that is already on ice cell c stops, and whether it meets a monster after c
+        stop = array('i', [0]) * cells
+        danger = bytearray(cells)
+        for d, (dx, dy) in enumerate(self.DIRECTIONS.values()):
+            bit = 1 << d
+            step = dy * width + dx
+            # visit cells so that the neighbour in direction d is always done first
+            xs = range(width - 1, -1, -1) if dx > 0 else range(width)
+            ys = range(height - 1, -1, -1) if dy > 0 else range(height)
+            for y in ys:
+                for x in xs:
+                    cell = y * width + x
+                    here = grid[cell]
+                    if here & ICE:
+                        if here & bit or not (0 <= x + dx < width and 0 <= y + dy < height):
+                            stop[cell] = cell
+                            danger[cell] = 0
+                        else:
+                            nxt = cell + step
+                            if grid[nxt] & ICE:
+                                stop[cell] = stop[nxt]
+                                danger[cell] = (grid[nxt] & MONSTER) >> 5 | danger[nxt]
+                            else:
+                                stop[cell] = nxt
+                                danger[cell] = (grid[nxt] & MONSTER) >> 5
+                    if here & bit:
+                        continue
+                    nxt = cell + step
+                    if grid[nxt] & ICE:
+                        dest[cell * 4 + d] = stop[nxt]
+                        hazard[cell * 4 + d] = (grid[nxt] & MONSTER) >> 5 | danger[nxt]
+                    else:
+                        dest[cell * 4 + d] = nxt
+                        hazard[cell * 4 + d] = (grid[nxt] & MONSTER) >> 5
+        tables = (dest, hazard)
+        self._cache['move'] = tables
+        return tables
+
+    def _slide_steps(self):
+        """Cells skipped over by ice slides, summed over every (cell, direction)."""
+        dest = self.move_table()[0]
+        width = self.width
+        steps = 0
+        for i, target in enumerate(dest):
+            if target >= 0:
+                cell = i >> 2
+                steps += abs(target % width - cell % width) + abs(target // width - cell // width) - 1
+        return steps
+
+    def solve_ice(self, start, goal, avoid_monsters=True):
+        """
+        Move-count-optimal route under the real movement rules (ice slides),
+        by BFS over the move table. Returns the cells the player stops on,
+        from start to goal, or [] if the goal cannot be reached.
+        """
+        dest, hazard = self.move_table()
+        width = self.width
+        source, target = self.idx(*start), self.idx(*goal)
+        prev = {source: None}
+        queue = deque([source])
+        while queue:
+            cell = queue.popleft()
+            if cell == target:
+                break
+            base = cell * 4
+            for d in range(4):
+                nxt = dest[base + d]
+                if nxt < 0 or nxt in prev or (avoid_monsters and hazard[base + d]):
+                    continue
+                prev[nxt] = cell
+                queue.append(nxt)
+        if target not in prev:
+            return []
+        route, cell = [], target
+        while cell is not None:
+            route.append((cell % width, cell // width))
+            cell = prev[cell]
+        return route[::-1]
+
+    def is_solvable(self):
+        """True if the exit can be reached under ice and monster rules."""
+        return bool(self.solve_ice(self.start, self.end))
 
     def simulate_slide(self, node, dx, dy):
         """
@@ -267,13 +1247,15 @@ class EchoMaze:
         """
         x, y = node
         dir_name = next((d for d,(vx,vy) in self.DIRECTIONS.items() if (vx,vy)==(dx,dy)), None)
-        if dir_name is None or self.cells[self.idx(x, y)][dir_name]:
+        grid = self.grid
+        if dir_name is None or grid[self.idx(x, y)] & DIR_BIT[dir_name]:
             return None
+        bit = DIR_BIT[dir_name]
         nx, ny = x + dx, y + dy
         while True:
-            if self.floor_type[ny][nx] == 'floor':
+            if not grid[self.idx(nx, ny)] & ICE:
                 return (nx, ny)
-            if not self.in_bounds(nx + dx, ny + dy) or self.cells[self.idx(nx, ny)][dir_name]:
+            if not self.in_bounds(nx + dx, ny + dy) or grid[self.idx(nx, ny)] & bit:
                 return (nx, ny)
             nx += dx; ny += dy
           
@@ -288,7 +1270,8 @@ class EchoMaze:
               if curr == end:
                   return True
               for dest in self.slide_dest.get(curr, {}).values():
-                  if dest not in visited:
+                  # None: a wall blocks that direction
+                  if dest is not None and dest not in visited:
                       visited.add(dest)
                       queue.append(dest)
           return False
@@ -305,58 +1288,48 @@ class EchoMaze:
         data = {
             "width": self.width,
             "height": self.height,
-            "cells": self.cells,
+            "difficulty": self.difficulty,
+            "generator": self.generator,
+            "seed": self.seed,
+            "cells": [dict(cell) for cell in self.cells],
             "start": self.start,
             "end": self.end,
-            "monsters": self.monsters
+            "monsters": sorted(self.monsters),
+            "ice": [(x, y) for y in range(self.height) for x in range(self.width)
+                    if self.grid[self.idx(x, y)] & ICE],
+            "solution": self.solution
         }
         with open(filename, 'w') as f:
             json.dump(data, f, indent=2)
 
-    def print(self):
+    @classmethod
+    def load_from_json(cls, filename):
+        """Load a maze written by save_to_json."""
+        with open(filename) as f:
+            data = json.load(f)
+        width, height = data['width'], data['height']
+        grid = bytearray(width * height)
+        for i, cell in enumerate(data['cells']):
+            for d, wall in cell.items():
+                if wall:
+                    grid[i] |= DIR_BIT[d]
+        for x, y in data.get('monsters', ()):
+            grid[y * width + x] |= MONSTER
+        for x, y in data.get('ice', ()):
+            grid[y * width + x] |= ICE
+        solution = [tuple(p) for p in data['solution']] if 'solution' in data else None
+        return cls.from_grid(width, height, grid, data['start'], data['end'],
+                             difficulty=data.get('difficulty', 'easy'), solution=solution,
+                             generator=data.get('generator', 'backtracker'), seed=data.get('seed'))
+
+    def print(self, out=None):
         """
-        ASCII maze visualizer.
+        ASCII maze visualizer (to stdout, or any text file `out`).
         S = start, E = exit, M = monster
         * = floor on solution path, ~ = ice off path, # = ice on path
+        Written in buffered chunks by maze_export.write_ascii; export_png draws the same as an image.
         """
-        path_set = set(self.solution)
-        # ice_cells = [(x, y)
-        #              for y in range(self.height)
-        #              for x in range(self.width)
-        #              if getattr(self, 'floor_type', None) and self.floor_type[y][x] == 'ice']
-        # print(f"Ice cells: {ice_cells}")
-        
-        print('+' + '---+' * self.width)
-        for y in range(self.height):
-            line = '|'
-            for x in range(self.width):
-                coord = (x, y)
-                if coord == self.start:
-                    cell = ' S '
-                elif coord == self.end:
-                    cell = ' E '
-                elif coord in self.monsters:
-                    cell = ' M '
-                elif coord in path_set and getattr(self, 'floor_type', None) and self.floor_type[y][x] == 'ice':
-                    cell = ' # '
-                elif coord in path_set:
-                    cell = ' * '
-                elif getattr(self, 'floor_type', None) and self.floor_type[y][x] == 'ice':
-                    cell = ' ~ '
-                else:
-                    cell = '   '
-                if self.cells[self.idx(x, y)]['RIGHT']:
-                    line += cell + '|'
-                else:
-                    line += cell + ' '
-            print(line)
-            bottom = '+'
-            for x in range(self.width):
-                if self.cells[self.idx(x, y)]['DOWN']:
-                    bottom += '---+'
-                else:
-                    bottom += '   +'
-            print(bottom)
+        write_ascii(self, out)
         
 if __name__ =="__main__":
     maze=EchoMaze(10,10,difficulty='easy')
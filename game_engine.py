@@ -1,42 +1,44 @@
+import os
+import time
 import pygame
-from echo_maze import EchoMaze
-
-pygame.init()
-pygame.font.init()
-title_font=pygame.font.Font('fonts/Tiny5-Regular.ttf',40)
-font = pygame.font.Font('fonts/Tiny5-Regular.ttf',25)
-small_font = pygame.font.Font('fonts/Tiny5-Regular.ttf',25)
-
-pygame.mixer.music.load('sounds/creepy_bg.mp3')
-pygame.mixer.music.play(-1)
-slide_sound = pygame.mixer.Sound('sounds/slide.mp3')
-thud_sound = pygame.mixer.Sound('sounds/thud.mp3')
-growl_sound = pygame.mixer.Sound('sounds/growl.mp3')
-breeze_sound = pygame.mixer.Sound('sounds/breeze.mp3')
-win_sound = pygame.mixer.Sound('sounds/win.mp3')
-lose_sound = pygame.mixer.Sound('sounds/girl_lose.mp3')
+from assets import Assets
+from chunked_world import ChunkedMaze
+from game_session import GameSession
+from maze_pool import MazePool
+from renderer import GameRenderer
+from replay import ReplayRecorder
+
+# Time-to-first-frame is measured from here, once every module above is imported
+_IMPORTED = time.perf_counter()
 
 CELL_SIZE = 60
 VIEW_SIZE = 7  
-SCREEN = pygame.display.set_mode((VIEW_SIZE * CELL_SIZE, VIEW_SIZE * CELL_SIZE + 50))
-pygame.display.set_caption("Whispers of the Maze")
-
-
-player_sprites = {
-    'UP': pygame.image.load('icon/player_up.png'),
-    'DOWN': pygame.image.load('icon/player_down.png'),
-    'LEFT': pygame.image.load('icon/left.png'),
-    'RIGHT': pygame.image.load('icon/right.png')
+MAZE_SIZE = 10
+# 'World' mode: a 1024x1024 maze carved lazily in 16x16 chunks as the player walks
+WORLD_CHUNKS = 64
+WORLD_CHUNK_SIZE = 16
+# Ready mazes kept per difficulty so a restart does not stall on generation
+MAZE_POOL = MazePool(size=2)
+# Set to a directory to save a replay log of every game (check with `python replay.py verify`)
+REPLAY_DIR = None
+# Say "warmer"/"colder" after each move, from the maze's distance-to-exit field (an easier mode)
+HINTS = False
+# Echo growls fade from full volume for an adjacent monster to silent beyond this many steps
+# (walking distance to the nearest monster, from EchoMaze.distance_to_monster)
+DANGER_RANGE = 3
+# Window, fonts, images and sounds load on first use, not at import
+ASSETS = Assets((VIEW_SIZE * CELL_SIZE, VIEW_SIZE * CELL_SIZE + 50), "Whispers of the Maze", created=_IMPORTED)
+TITLE_FONT = 40
+TEXT_FONT = 25
+BUTTON_FONT = 30
+
+
+PLAYER_SPRITES = {
+    'UP': 'icon/player_up.png',
+    'DOWN': 'icon/player_down.png',
+    'LEFT': 'icon/left.png',
+    'RIGHT': 'icon/right.png'
 }
-current_sprite = player_sprites['DOWN']
-
-
-monster_img = pygame.image.load('icon/monster.png')
-monster_img = pygame.transform.scale(monster_img, (CELL_SIZE, CELL_SIZE))
-wall_img = pygame.image.load('icon/wall.png')
-wall_img = pygame.transform.scale(wall_img, (CELL_SIZE, CELL_SIZE))
-exit_img = pygame.image.load('icon/exit.png')
-exit_img = pygame.transform.scale(exit_img, (CELL_SIZE-10, CELL_SIZE-10))
 
 
 # player_img = pygame.image.load('icon/icon.png')
@@ -50,26 +52,52 @@ CYAN = (0, 100, 255)
 YELLOW = (255, 255, 0)
 WHITE = (255, 255, 255)
 
+MOVE_KEYS = {pygame.K_UP: 'UP', pygame.K_DOWN: 'DOWN', pygame.K_LEFT: 'LEFT', pygame.K_RIGHT: 'RIGHT'}
+ECHO_KEYS = {pygame.K_w: 'UP', pygame.K_s: 'DOWN', pygame.K_a: 'LEFT', pygame.K_d: 'RIGHT'}
+ECHO_SOUNDS = {'wall': 'a thud', 'monster': 'a growl', 'exit': 'a breeze'}
+
+_renderer = None
+
+
+def get_renderer():
+    """The in-game renderer, built (with its sprites and tiles) on first use."""
+    global _renderer
+    if _renderer is None:
+        size = (CELL_SIZE, CELL_SIZE)
+        tiles = {
+            'wall': ASSETS.image('icon/wall.png', size),
+            'monster': ASSETS.image('icon/monster.png', size),
+            'exit': ASSETS.image('icon/exit.png', (CELL_SIZE - 10, CELL_SIZE - 10)),
+        }
+        sprites = {d: ASSETS.image(path) for d, path in PLAYER_SPRITES.items()}
+        _renderer = GameRenderer(ASSETS.screen(), ASSETS.font(TEXT_FONT), sprites, tiles, CELL_SIZE, VIEW_SIZE)
+    return _renderer
+
 def draw_button(text, y_pos):
-    button_font = pygame.font.Font('fonts/Tiny5-Regular.ttf',30)
-    button_text = button_font.render(text, True, BLACK)
+    button_text = ASSETS.font(BUTTON_FONT).render(text, True, BLACK)
     button_rect = button_text.get_rect(center=(VIEW_SIZE * CELL_SIZE // 2, y_pos))
-    pygame.draw.rect(SCREEN, GRAY, button_rect.inflate(20, 10))
-    SCREEN.blit(button_text, button_rect)
+    screen = ASSETS.screen()
+    pygame.draw.rect(screen, GRAY, button_rect.inflate(20, 10))
+    screen.blit(button_text, button_rect)
     return button_rect
 
 def show_start_screen():
-    SCREEN.fill(BLACK)
-    title = title_font.render("Whispers of the Maze", True, RED)
-    SCREEN.blit(title, title.get_rect(center=(VIEW_SIZE * CELL_SIZE // 2, 150)))
+    MAZE_POOL.resume()
+    screen = ASSETS.screen()
+    screen.fill(BLACK)
+    title = ASSETS.font(TITLE_FONT).render("Whispers of the Maze", True, RED)
+    screen.blit(title, title.get_rect(center=(VIEW_SIZE * CELL_SIZE // 2, 150)))
 
 
-    subtitle = font.render("You find yourself lost in the dark...", True, WHITE)
-    SCREEN.blit(subtitle, subtitle.get_rect(center=(VIEW_SIZE * CELL_SIZE // 2, 200)))
+    subtitle = ASSETS.font(TEXT_FONT).render("You find yourself lost in the dark...", True, WHITE)
+    screen.blit(subtitle, subtitle.get_rect(center=(VIEW_SIZE * CELL_SIZE // 2, 200)))
 
 
     start_btn = draw_button("Start Game", 400)
     pygame.display.flip()
+    ASSETS.mark_frame()
+    # sounds and music load while the player reads the title
+    ASSETS.load_sounds_async()
 
     waiting = True
     while waiting:
@@ -84,13 +112,16 @@ def show_start_screen():
                 waiting = False
 
 def show_difficulty_screen():
-    SCREEN.fill(BLACK)
-    title = title_font.render("Select Difficulty", True, RED)
-    SCREEN.blit(title, title.get_rect(center=(VIEW_SIZE * CELL_SIZE // 2, 150)))
+    MAZE_POOL.resume()
+    screen = ASSETS.screen()
+    screen.fill(BLACK)
+    title = ASSETS.font(TITLE_FONT).render("Select Difficulty", True, RED)
+    screen.blit(title, title.get_rect(center=(VIEW_SIZE * CELL_SIZE // 2, 150)))
 
     easy_btn = draw_button("Easy", 250)
     medium_btn = draw_button("Medium", 310)
-    # hard_btn = draw_button("Hard", 370)
+    hard_btn = draw_button("Hard", 370)
+    world_btn = draw_button("World", 430)
     pygame.display.flip()
 
     while True:
@@ -103,21 +134,27 @@ def show_difficulty_screen():
                     return 'easy'
                 elif medium_btn.collidepoint(event.pos):
                     return 'medium'
-                # elif hard_btn.collidepoint(event.pos):
-                #     return 'hard'
+                elif hard_btn.collidepoint(event.pos):
+                    return 'hard'
+                elif world_btn.collidepoint(event.pos):
+                    return 'world'
             elif event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_1:
                     return 'easy'
                 elif event.key == pygame.K_2:
                     return 'medium'
-                # elif event.key == pygame.K_3:
-                #     return 'hard'
+                elif event.key == pygame.K_3:
+                    return 'hard'
+                elif event.key == pygame.K_4:
+                    return 'world'
 
 
 def show_end_screen(message, color):
-    SCREEN.fill(BLACK)
-    text = title_font.render(message, True, color)
-    SCREEN.blit(text, text.get_rect(center=(VIEW_SIZE * CELL_SIZE // 2, 200)))
+    MAZE_POOL.resume()
+    screen = ASSETS.screen()
+    screen.fill(BLACK)
+    text = ASSETS.font(TITLE_FONT).render(message, True, color)
+    screen.blit(text, text.get_rect(center=(VIEW_SIZE * CELL_SIZE // 2, 200)))
     restart_btn = draw_button("Restart", 300)
     quit_btn = draw_button("Quit", 350)
     pygame.display.flip()
@@ -141,136 +178,102 @@ def show_end_screen(message, color):
                     exit()
 
 
+def save_replay(recorder, session, difficulty):
+    """Append the finished (or abandoned) game's replay log to today's pack in REPLAY_DIR."""
+    if recorder is None:
+        return
+    os.makedirs(REPLAY_DIR, exist_ok=True)
+    filename = os.path.join(REPLAY_DIR, f"{time.strftime('%Y%m%d')}-{difficulty}.emr")
+    with open(filename, 'ab') as f:
+        f.write(recorder.finish(session))
+
+
+def growl_volume(steps):
+    """Echo growl volume for a monster `steps` away: full when adjacent, silent past DANGER_RANGE."""
+    return max(0.0, 1 - (steps - 1) / DANGER_RANGE)
+
+
 def run_game(difficulty):
-    maze = EchoMaze(10, 10,difficulty)
+    if difficulty == 'world':
+        maze = ChunkedMaze(WORLD_CHUNKS, WORLD_CHUNKS, WORLD_CHUNK_SIZE, 'medium')
+    else:
+        maze = MAZE_POOL.get(difficulty, MAZE_SIZE, MAZE_SIZE)
+    MAZE_POOL.pause()
     # for testing
     # maze.print()
-    player_pos = list(maze.start)
+    recorder = ReplayRecorder(maze) if REPLAY_DIR else None
+    session = GameSession(maze, recorder)
+    # O(1) hints from the cached distance field (the chunked world has none)
+    exit_dist = maze.distance_to_exit() if HINTS and hasattr(maze, 'distance_to_exit') else None
+    # growls are as loud as the nearest monster is close, by walking distance
+    # (the chunked world has no field and goes by the echo's range)
+    monster_dist = maze.distance_to_monster() if hasattr(maze, 'distance_to_monster') else None
     echo_feedback = []
     echo_timer = 0
     status_message = "Find the exit and escape this place!"
     clock = pygame.time.Clock()
-    global current_sprite
-    current_sprite = player_sprites['DOWN']
+    facing = 'DOWN'
+    renderer = get_renderer()
+    renderer.reset()
 
     while True:
         clock.tick(60)
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
+                save_replay(recorder, session, difficulty)
                 pygame.quit()
                 exit()
             elif event.type == pygame.KEYDOWN:
-                move_dir = None
-                if event.key == pygame.K_UP:
-                    move_dir = 'UP'
-                elif event.key == pygame.K_DOWN:
-                    move_dir = 'DOWN'
-                elif event.key == pygame.K_LEFT:
-                    move_dir = 'LEFT'
-                elif event.key == pygame.K_RIGHT:
-                    move_dir = 'RIGHT'
-
+                move_dir = MOVE_KEYS.get(event.key)
                 if move_dir:
-                    current_sprite = player_sprites[move_dir]
-                    dx, dy = maze.DIRECTIONS[move_dir]
-                    idx = maze.idx(player_pos[0], player_pos[1])
-                    if not maze.cells[idx][move_dir]:
-                        player_pos[0] += dx
-                        player_pos[1] += dy
-                        status_message = f"You moved {move_dir}."
-                        if maze.floor_type[player_pos[1]][player_pos[0]] == 'ice':
-                            slide_sound.play()
-                            # dest = maze.slide_dest.get(tuple(player_pos), {}).get(move_dir)
-                            # if dest:
-                            #     player_pos = list(dest)
-                            #     status_message = f"Oops! You slipped across the ice!"
-                            slide_from = tuple(player_pos)
-                            dest = maze.slide_dest.get(slide_from, {}).get(move_dir)
-
-                            if dest:
-                                # 1. Play skating sound effects
-                                slide_sound.play()
-
-                                # 2. Simulated sliding path (Manually advance one by one to check the monsters)
-                                dx, dy = maze.DIRECTIONS[move_dir]
-                                x, y = slide_from
-                                while (x, y) != dest:
-                                    x += dx
-                                    y += dy
-                                    if (x, y) in maze.monsters:
-                                        growl_sound.play()
-                                        lose_sound.play()
-                                        show_end_screen("GAME OVER!", RED)
-                                        return
-
-                                # 3. sliding ends. Update the player's position
-                                player_pos = list(dest)
-                                status_message = f"Oops! You slipped across the ice!"
-
-
-
-                                # 4. Examine if skating to the ends
-                                if tuple(player_pos) == maze.end:
-                                    win_sound.play()
-                                    show_end_screen("YOU WIN!", GREEN)
-                                    return
-
-                        if tuple(player_pos) == maze.end:
-                            win_sound.play()
-                            if show_end_screen("YOU WIN!", GREEN):
-                                return
-                        if tuple(player_pos) in maze.monsters:
-                            growl_sound.play()
-                            lose_sound.play()
+                    facing = move_dir
+                    before = session.pos
+                    events = session.move(move_dir)
+                    if session.over:
+                        save_replay(recorder, session, difficulty)
+                    for kind, *info in events:
+                        if kind == 'moved':
+                            status_message = f"You moved {move_dir}."
+                        elif kind == 'slid':
+                            ASSETS.play('slide')
+                            status_message = f"Oops! You slipped across the ice!"
+                        elif kind == 'monster':
+                            ASSETS.play('growl')
+                            ASSETS.play('lose')
                             if show_end_screen("GAME OVER!", RED):
                                 return
+                        elif kind == 'exit':
+                            ASSETS.play('win')
+                            if show_end_screen("YOU WIN!", GREEN):
+                                return
+                    if exit_dist is not None and session.pos != before and not session.over:
+                        closer = exit_dist[session.pos] < exit_dist[before]
+                        status_message += " Warmer..." if closer else " Colder..."
 
-                echo_dir = None
-                if event.key == pygame.K_w:
-                    echo_dir = 'UP'
-                elif event.key == pygame.K_s:
-                    echo_dir = 'DOWN'
-                elif event.key == pygame.K_a:
-                    echo_dir = 'LEFT'
-                elif event.key == pygame.K_d:
-                    echo_dir = 'RIGHT'
-
+                echo_dir = ECHO_KEYS.get(event.key)
                 if echo_dir:
-                    echoes = maze.send_echo(tuple(player_pos), echo_dir)
-                    if not echoes:
+                    (echo,) = session.echo(echo_dir)
+                    if echo[0] == 'silence':
                         status_message = "Silence... Nothing detected."
+                        echo_feedback = []
                     else:
-                        first_echo = echoes[0]
-                        sound_desc = {
-                            'wall': 'a thud',
-                            'monster': 'a growl',
-                            'exit': 'a breeze'
-                        }
-                        heard = sound_desc.get(first_echo['type'], 'something')
-                        status_message = f"You hear {heard} after {first_echo['delay']}s."
-                    echo_feedback = [(echo_dir, e['type'], (e['delay']//2)+1) for e in echoes]
+                        _, _, obj_type, delay = echo
+                        status_message = f"You hear {ECHO_SOUNDS[obj_type]} after {delay}s."
+                        echo_feedback = [(echo_dir, obj_type, (delay // 2) + 1)]
+                        if obj_type == 'wall':
+                            ASSETS.play('thud')
+                        elif obj_type == 'monster':
+                            steps = monster_dist[session.pos] if monster_dist is not None else delay // 2 + 1
+                            ASSETS.play('growl', growl_volume(steps))
+                        elif obj_type == 'exit':
+                            ASSETS.play('breeze')
                     echo_timer = pygame.time.get_ticks()
-                    for e in echoes:
-                        if e['type'] == 'wall':
-                            thud_sound.play()
-                        elif e['type'] == 'monster':
-                            growl_sound.play()
-                        elif e['type'] == 'exit':
-                            breeze_sound.play()
-
-        SCREEN.fill(BLACK)
 
-        px, py = player_pos
+        px, py = session.position
         offset_x = px - VIEW_SIZE // 2
         offset_y = py - VIEW_SIZE // 2
 
-        for vy in range(VIEW_SIZE):
-            for vx in range(VIEW_SIZE):
-                mx = offset_x + vx
-                my = offset_y + vy
-                if not maze.in_bounds(mx, my):
-                    continue
-
+        overlay = {}
         if echo_feedback and pygame.time.get_ticks() - echo_timer < 500:
             for direction, obj_type, steps in echo_feedback:
                 dx, dy = maze.DIRECTIONS[direction]
@@ -278,24 +281,14 @@ def run_game(difficulty):
                 vx = ex - offset_x
                 vy = ey - offset_y
                 if 0 <= vx < VIEW_SIZE and 0 <= vy < VIEW_SIZE:
-                    rect = pygame.Rect(vx * CELL_SIZE, vy * CELL_SIZE + 50, CELL_SIZE, CELL_SIZE)
-                    if obj_type == 'wall':
-                        SCREEN.blit(wall_img,rect)
-                    elif obj_type == 'monster':
-                        SCREEN.blit(monster_img, rect)
-                    elif obj_type == 'exit':
-                        SCREEN.blit(exit_img,rect)
-
-        center_rect = pygame.Rect((VIEW_SIZE//2) * CELL_SIZE, (VIEW_SIZE//2) * CELL_SIZE + 50, CELL_SIZE, CELL_SIZE)
-        # pygame.draw.circle(SCREEN, YELLOW, center_rect.center, CELL_SIZE // 3)
-        SCREEN.blit(pygame.transform.scale(current_sprite, (CELL_SIZE, CELL_SIZE)), center_rect)
-
-        status_text = small_font.render(status_message, True, WHITE)
-        SCREEN.blit(status_text, (10, 10))
+                    overlay[(vx, vy)] = obj_type
 
-        pygame.display.flip()
+        # only changed tiles and the status bar are redrawn
+        renderer.draw(status_message, WHITE, facing, overlay)
 
 def main():
+    for difficulty in ('easy', 'medium', 'hard'):
+        MAZE_POOL.want(difficulty, MAZE_SIZE, MAZE_SIZE)
     show_start_screen()
 
     while True:
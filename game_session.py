@@ -0,0 +1,116 @@
+"""
+Headless game rules shared by every front end (pygame, CLI, AI, server).
+
+A GameSession owns the player position and applies one action at a time:
+    events = session.step(action)
+Actions are small ints: MOVE + dir or ECHO + dir, with dir in DIR_NAMES order
+(UP, DOWN, RIGHT, LEFT). Events are tuples the front end renders:
+    ('blocked', dir)                  wall in the way, nothing happens
+    ('moved', dir, pos)               stepped onto normal floor
+    ('slid', dir, pos)                stepped onto ice and slid on to pos
+    ('monster', pos)                  walked or slid into a monster: game over
+    ('exit', pos)                     reached the exit: win
+    ('echo', dir, type, delay)        echo heard ('wall', 'monster' or 'exit')
+    ('silence', dir)                  echo heard nothing
+Nothing here imports pygame.
+"""
+
+from maze_grid import DIR_NAMES, DIR_INDEX, MONSTER, ECHO_TYPES
+
+MOVE = 0
+ECHO = 4
+ACTIONS = {f'{verb} {d}': base + i for verb, base in (('MOVE', MOVE), ('ECHO', ECHO))
+           for i, d in enumerate(DIR_NAMES)}
+ACTION_NAMES = {code: name for name, code in ACTIONS.items()}
+
+
+def parse_action(text):
+    """'move up' -> action code; raises ValueError for anything else."""
+    key = ' '.join(text.upper().split())
+    if key not in ACTIONS:
+        raise ValueError(f"Unknown action {text!r}")
+    return ACTIONS[key]
+
+
+class GameSession:
+    """
+    One game on one maze.
+    - Moves follow the maze's move table: ice slides, monsters met mid-slide
+    - Echoes are lookups in the maze's echo table
+    - Tracks moves, slides, echoes, and whether the game is over
+    - Optionally hands every action and its events to a recorder (see replay)
+    """
+    def __init__(self, maze, recorder=None):
+        self.maze = maze
+        self.recorder = recorder
+        self.width = maze.width
+        self.pos = maze.idx(*maze.start)
+        self.end = maze.idx(*maze.end)
+        self.moves = 0
+        self.slides = 0
+        self.echoes = 0
+        self.won = False
+        self.dead = False
+        self.over = False
+        self._dest, self._hazard = maze.move_table()
+        self._echo = maze.echo_table()
+        self._grid = maze.grid
+
+    @property
+    def position(self):
+        return (self.pos % self.width, self.pos // self.width)
+
+    def step(self, action):
+        """Apply one action and return its events; a finished game ignores further actions."""
+        if self.over:
+            return ()
+        events = self._apply(action)
+        if self.recorder is not None:
+            self.recorder.record(action, events)
+        return events
+
+    def _apply(self, action):
+        d = action & 3
+        i = self.pos * 4 + d
+        if action >= ECHO:
+            self.echoes += 1
+            code = self._echo[i]
+            if code:
+                return (('echo', DIR_NAMES[d], ECHO_TYPES[code & 3], (code >> 2) * 2),)
+            return (('silence', DIR_NAMES[d]),)
+        dest = self._dest[i]
+        if dest < 0:
+            return (('blocked', DIR_NAMES[d]),)
+        self.moves += 1
+        if self._hazard[i]:
+            pos = self._first_monster(d)
+            self.pos = self.maze.idx(*pos)
+            self.dead = self.over = True
+            return (('monster', pos),)
+        width = self.width
+        slid = dest != self.pos + (-width, width, 1, -1)[d]
+        self.pos = dest
+        pos = (dest % width, dest // width)
+        if slid:
+            self.slides += 1
+            event = ('slid', DIR_NAMES[d], pos)
+        else:
+            event = ('moved', DIR_NAMES[d], pos)
+        if dest == self.end:
+            self.won = self.over = True
+            return (event, ('exit', pos))
+        return (event,)
+
+    def move(self, direction):
+        return self.step(MOVE + DIR_INDEX[direction])
+
+    def echo(self, direction):
+        return self.step(ECHO + DIR_INDEX[direction])
+
+    def _first_monster(self, d):
+        """Walk the move from the current cell to the first monster it runs into."""
+        step = (-self.width, self.width, 1, -1)[d]
+        cell = self.pos + step
+        while not self._grid[cell] & MONSTER:
+            cell += step
+        return (cell % self.width, cell // self.width)
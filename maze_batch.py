@@ -0,0 +1,225 @@
+"""
+Batch generation: build many mazes of one size at once.
+
+generate_batch(n, width, height, difficulty, seed) stacks n packed grids (see
+maze_grid) into one bytes object and builds them with whole-array operations
+instead of per-cell Python loops:
+- random bytes for every cell of every maze come from one rng.randbytes() call
+- per-cell decisions are bytes.translate() lookups
+- masks are combined as big integers (one byte per cell, so OR/AND/shift act on
+  every cell of the whole batch in a single C-level operation)
+Carving is the binary-tree algorithm (see maze_gen.carve_binary_tree), where every
+cell decides on its own. Only start/end selection and the solution walk run per
+maze, and they cost O(width + height) per draw rather than O(width * height): the
+exit is checked against the length of the tree route instead of a BFS field.
+
+batch.maze(i) (or batch[i]) gives an ordinary EchoMaze for the agents and the game.
+"""
+
+import random
+from array import array
+from echo_maze import EchoMaze
+from maze_grid import WALL_BITS, ICE, MONSTER, bernoulli_table as _bernoulli
+
+UP, DOWN, RIGHT, LEFT = 1, 2, 4, 8
+
+COIN = _bernoulli(0.5)
+MONSTER_RATE = _bernoulli(0.2)
+ICE_RATE = _bernoulli(0.3)
+# hard mazes open ~w*h/10 extra walls: half of them RIGHT, half DOWN
+HARD_LOOP_RATE = _bernoulli(0.05)
+MEDIUM_LOOPS = 5
+
+# Binary tree choice: code = coin | can_up << 1 | can_left << 2
+CARVE_UP = bytes(1 if c & 2 and (c & 1 or not c & 4) else 0 for c in range(256))
+CARVE_LEFT = bytes(1 if c & 4 and not CARVE_UP[c] else 0 for c in range(256))
+# Walls from code = up | left << 1 | below_up << 2 | right_left << 3
+TREE_WALLS = bytes(WALL_BITS & ~((c & 1) * UP | (c >> 1 & 1) * LEFT | (c >> 2 & 1) * DOWN | (c >> 3 & 1) * RIGHT)
+                   for c in range(256))
+# 1 for cells that are a straight corridor (open exactly UP+DOWN or LEFT+RIGHT)
+STRAIGHT = bytes(1 if b & WALL_BITS in (RIGHT | LEFT, UP | DOWN) else 0 for b in range(256))
+
+
+def _int(data):
+    return int.from_bytes(data, 'big')
+
+
+def _bytes(value, length):
+    return value.to_bytes(length, 'big')
+
+
+def _template(width, height, test):
+    """One maze worth of 0/1 bytes, 1 where test(x, y) holds."""
+    return bytes(1 if test(x, y) else 0 for y in range(height) for x in range(width))
+
+
+def _shift(mask, k):
+    """mask moved k cells forward: out[i] = mask[i - k], zero-filled."""
+    return b'\0' * k + mask[:-k]
+
+
+class MazeBatch:
+    """
+    n mazes of one size stored back to back:
+    - grids: n * width * height bytes, maze i at [i * cells, (i + 1) * cells)
+    - starts, ends: cell index per maze
+    - solutions: a start-to-exit route per maze (the tree path; with extra loops
+      it is valid but not necessarily the shortest)
+    """
+    def __init__(self, width, height, difficulty, seed, grids, starts, ends, solutions):
+        self.width = width
+        self.height = height
+        self.difficulty = difficulty
+        self.seed = seed
+        self.grids = grids
+        self.starts = starts
+        self.ends = ends
+        self.solutions = solutions
+
+    def __len__(self):
+        return len(self.starts)
+
+    def grid(self, i):
+        """Maze i's packed grid, without copying."""
+        cells = self.width * self.height
+        return memoryview(self.grids)[i * cells:(i + 1) * cells]
+
+    def maze(self, i):
+        """Maze i as an EchoMaze (its own copy of the grid)."""
+        if not -len(self) <= i < len(self):
+            raise IndexError('maze number out of range')
+        i %= len(self)
+        w = self.width
+        return EchoMaze.from_grid(
+            w, self.height, self.grid(i),
+            (self.starts[i] % w, self.starts[i] // w), (self.ends[i] % w, self.ends[i] // w),
+            difficulty=self.difficulty,
+            solution=[(c % w, c // w) for c in self.solutions[i]],
+            generator='binary_tree')
+
+    __getitem__ = maze
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self.maze(i)
+
+
+def _endpoints(rng, width, height, route, attempts=64):
+    """
+    Random start and exit whose route(start, end) is at least (width + height) // 2
+    steps long, or the longest of `attempts` draws; returns (start, end, route).
+    The route runs along the carved tree, so on easy mazes its length is the path
+    distance EchoMaze checks; extra loops (medium/hard) may give a shorter way.
+    Each draw costs O(width + height), where a BFS would cost O(width * height).
+    """
+    min_dist = (width + height) // 2
+    cells = width * height
+    best = None
+    for _ in range(attempts):
+        start, end = rng.randrange(cells), rng.randrange(cells)
+        path = route(start, end)
+        if best is None or len(path) > len(best[2]):
+            best = (start, end, path)
+        if len(path) - 1 >= min_dist:
+            break
+    return best
+
+
+def _tree_path(up, left, width, base, start, end):
+    """
+    Route between two cells of a binary-tree maze: both climb towards the
+    top-left root (UP or LEFT, whichever the cell carved) until they meet.
+    """
+    def parent(cell):
+        if up[base + cell]:
+            return cell - width
+        if left[base + cell]:
+            return cell - 1
+        return -1
+
+    seen = {}
+    cell = start
+    while cell >= 0:
+        seen[cell] = len(seen)
+        cell = parent(cell)
+    tail = []
+    cell = end
+    while cell not in seen:
+        tail.append(cell)
+        cell = parent(cell)
+    route = [c for c, k in seen.items() if k <= seen[cell]]
+    route.extend(reversed(tail))
+    return route
+
+
+def generate_batch(n, width=10, height=10, difficulty='easy', seed=None):
+    """
+    Build n mazes at once; returns a MazeBatch.
+    Monsters (~20% of the cells off the solution route), ice (~30% of the
+    straight corridor cells) and, for medium/hard, extra loops are drawn for the
+    whole batch in one go. The solution route never holds a monster, and the
+    start and exit are never ice, so every maze is solvable.
+    """
+    if seed is None:
+        seed = random.getrandbits(64)
+    rng = random.Random(seed)
+    cells = width * height
+    total = n * cells
+
+    # Carve: every cell opens UP or LEFT
+    can_up = _template(width, height, lambda x, y: y > 0) * n
+    can_left = _template(width, height, lambda x, y: x > 0) * n
+    code = _bytes(_int(rng.randbytes(total).translate(COIN)) | _int(can_up) << 1 | _int(can_left) << 2, total)
+    up = code.translate(CARVE_UP)
+    left = code.translate(CARVE_LEFT)
+    # a cell loses its DOWN wall when the cell below carved UP, and its RIGHT wall
+    # when the cell to its right carved LEFT (row 0 never carves UP and column 0
+    # never LEFT, so shifting across maze and row boundaries brings in zeros)
+    code = _bytes(_int(up) | _int(left) << 1 | _int(up[width:] + b'\0' * width) << 2
+                  | _int(left[1:] + b'\0') << 3, total)
+    walls = _int(code.translate(TREE_WALLS))
+
+    # Extra loops: knock out random RIGHT/DOWN walls
+    if difficulty in ('medium', 'hard'):
+        can_right = _int(_template(width, height, lambda x, y: x < width - 1) * n)
+        can_down = _int(_template(width, height, lambda x, y: y < height - 1) * n)
+        if difficulty == 'hard':
+            right = _int(rng.randbytes(total).translate(HARD_LOOP_RATE)) & can_right
+            down = _int(rng.randbytes(total).translate(HARD_LOOP_RATE)) & can_down
+        else:
+            right_cells = bytearray(total)
+            down_cells = bytearray(total)
+            for cell in rng.sample(range(total), min(total, MEDIUM_LOOPS * n)):
+                (right_cells if rng.getrandbits(1) else down_cells)[cell] = 1
+            right = _int(right_cells) & can_right
+            down = _int(down_cells) & can_down
+        right_b = _bytes(right, total)
+        down_b = _bytes(down, total)
+        opened = (right * RIGHT | _int(_shift(right_b, 1)) * LEFT
+                  | down * DOWN | _int(_shift(down_b, width)) * UP)
+        walls &= ~opened
+
+    # Start, exit and solution route per maze
+    starts = array('i')
+    ends = array('i')
+    solutions = []
+    on_route = bytearray(total)
+    ends_mask = bytearray(total)
+    for i in range(n):
+        base = i * cells
+        start, end, route = _endpoints(rng, width, height,
+                                       lambda a, b: _tree_path(up, left, width, base, a, b))
+        route = array('i', route)
+        starts.append(start)
+        ends.append(end)
+        solutions.append(route)
+        for cell in route:
+            on_route[base + cell] = 1
+        ends_mask[base + start] = ends_mask[base + end] = 1
+
+    # Monsters off the route, ice on straight corridors but never the start or exit
+    monsters = _int(rng.randbytes(total).translate(MONSTER_RATE)) & ~_int(on_route)
+    straight = _int(_bytes(walls, total).translate(STRAIGHT))
+    ice = _int(rng.randbytes(total).translate(ICE_RATE)) & straight & ~_int(ends_mask)
+    grids = _bytes(walls | ice * ICE | monsters * MONSTER, total)
+    return MazeBatch(width, height, difficulty, seed, grids, starts, ends, solutions)
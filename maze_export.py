@@ -0,0 +1,194 @@
+"""
+Streaming ASCII and PNG export of whole mazes.
+
+Both exports work on rows of the packed grid (see maze_grid) with translate()
+and slice assignment, so there is no Python work per cell:
+- ASCII: every row is interleaved into a bytearray (cell symbol and right wall
+  at stride 4) and written in chunks of rows to any text file
+- PNG: an 8-bit palette image, (2 * width + 1) x (2 * height + 1) pixels times
+  `scale`, where cells sit on odd pixels and walls/passages between them;
+  scanlines are compressed as they are made, so memory stays a few rows
+
+    python maze_export.py 1000 1000 --ascii maze.txt --png maze.png
+"""
+
+import struct
+import sys
+import zlib
+from maze_grid import ICE, MONSTER
+
+UP, DOWN, RIGHT, LEFT = 1, 2, 4, 8
+# bit set on a copy of the grid for cells on the solution
+PATH = 0x40
+
+# ASCII symbols, same as EchoMaze.print: S start, E exit, M monster,
+# * solution, # ice on the solution, ~ ice, blank floor
+SYMBOLS = bytes(ord('M') if b & MONSTER else
+                (ord('#') if b & ICE else ord('*')) if b & PATH else
+                ord('~') if b & ICE else ord(' ') for b in range(256))
+RIGHT_CHARS = bytes(ord('|') if b & RIGHT else ord(' ') for b in range(256))
+DOWN_CHARS = bytes(ord('-') if b & DOWN else ord(' ') for b in range(256))
+ROWS_PER_WRITE = 256
+
+# PNG palette indices and colours
+FLOOR, WALL, ICE_PX, MONSTER_PX, PATH_PX, PATH_ICE_PX, START_PX, EXIT_PX = range(8)
+PALETTE = bytes((255, 255, 255,  0, 0, 0,  150, 210, 255,  220, 30, 30,
+                 255, 200, 0,  0, 170, 170,  0, 190, 0,  0, 60, 255))
+COLOURS = bytes(MONSTER_PX if b & MONSTER else
+                (PATH_ICE_PX if b & ICE else PATH_PX) if b & PATH else
+                ICE_PX if b & ICE else FLOOR for b in range(256))
+# passage pixels: bit 0 wall, bit 1 path on this side, bit 2 path on the other side
+PASSAGES = bytes(WALL if k & 1 else PATH_PX if k == 6 else FLOOR for k in range(256))
+WALL_BIT = {d: bytes(1 if b & d else 0 for b in range(256)) for d in (RIGHT, DOWN)}
+PATH_BIT = bytes(1 if b & PATH else 0 for b in range(256))
+IDAT_SIZE = 1 << 16
+
+
+def _marked(maze):
+    """Copy of the grid with PATH set on the solution cells."""
+    grid = bytearray(maze.grid)
+    width = maze.width
+    for x, y in maze.solution:
+        grid[y * width + x] |= PATH
+    return grid
+
+
+def write_ascii(maze, out=None, rows_per_write=ROWS_PER_WRITE):
+    """Write the maze as in EchoMaze.print to a text file (stdout by default)."""
+    out = sys.stdout if out is None else out
+    width, height = maze.width, maze.height
+    grid = maze.grid
+    symbols = _marked(maze).translate(SYMBOLS)
+    for (x, y), mark in ((maze.start, b'S'), (maze.end, b'E')):
+        symbols[y * width + x] = mark[0]
+    cell_line = bytearray(b' ' * (4 * width + 2))
+    cell_line[0] = ord('|')
+    cell_line[-1] = ord('\n')
+    wall_line = bytearray(b'+' * (4 * width + 2))
+    wall_line[-1] = ord('\n')
+    buf = bytearray(b'+' + b'---+' * width + b'\n')
+    for y in range(height):
+        row = grid[y * width:(y + 1) * width]
+        cell_line[2:-1:4] = symbols[y * width:(y + 1) * width]
+        cell_line[4::4] = row.translate(RIGHT_CHARS)
+        below = row.translate(DOWN_CHARS)
+        wall_line[1:-1:4] = below
+        wall_line[2::4] = below
+        wall_line[3::4] = below
+        buf += cell_line
+        buf += wall_line
+        if (y + 1) % rows_per_write == 0:
+            out.write(buf.decode('ascii'))
+            buf.clear()
+    out.write(buf.decode('ascii'))
+
+
+def export_ascii(maze, filename):
+    with open(filename, 'w') as f:
+        write_ascii(maze, f)
+
+
+def _chunk(out, kind, data):
+    out.write(struct.pack('>I', len(data)) + kind + data)
+    out.write(struct.pack('>I', zlib.crc32(data, zlib.crc32(kind))))
+
+
+def _scaled(line, scale):
+    """Scanline with every pixel repeated `scale` times."""
+    if scale == 1:
+        return line
+    wide = bytearray(len(line) * scale)
+    for i in range(scale):
+        wide[i::scale] = line
+    return wide
+
+
+def write_png(maze, out, scale=None):
+    """
+    Write the maze as a palette PNG to a binary file: walls black, ice light
+    blue, monsters red, the solution yellow (teal on ice), start green, exit blue.
+    scale is pixels per grid unit; by default the image is about 1000 pixels wide.
+    """
+    width, height = maze.width, maze.height
+    size = 2 * max(width, height) + 1
+    if scale is None:
+        scale = max(1, 1000 // size)
+    grid = _marked(maze)
+    colours = grid.translate(COLOURS)
+    for (x, y), colour in ((maze.start, START_PX), (maze.end, EXIT_PX)):
+        colours[y * width + x] = colour
+    path = grid.translate(PATH_BIT)
+    # pixels per line before scaling: a wall column either side of every cell
+    width_px = 2 * width + 1
+    out.write(b'\x89PNG\r\n\x1a\n')
+    _chunk(out, b'IHDR', struct.pack('>IIBBBBB', width_px * scale, (2 * height + 1) * scale, 8, 3, 0, 0, 0))
+    _chunk(out, b'PLTE', PALETTE)
+    compressor = zlib.compressobj(6)
+    pending = bytearray()
+
+    def emit(line):
+        scanline = b'\x00' + _scaled(line, scale)
+        for _ in range(scale):
+            pending.extend(compressor.compress(scanline))
+        if len(pending) >= IDAT_SIZE:
+            _chunk(out, b'IDAT', bytes(pending))
+            pending.clear()
+
+    walls = bytes([WALL]) * width_px
+    emit(walls)
+    cell_line = bytearray(walls)
+    wall_line = bytearray(walls)
+    no_path = bytes(width)
+    for y in range(height):
+        row = grid[y * width:(y + 1) * width]
+        here = path[y * width:(y + 1) * width]
+        nxt = path[(y + 1) * width:(y + 2) * width] or no_path
+        # passage pixel key: wall | path here << 1 | path beyond << 2
+        right = (int.from_bytes(row.translate(WALL_BIT[RIGHT]), 'big')
+                 | int.from_bytes(here, 'big') << 1
+                 | int.from_bytes(here[1:] + b'\x00', 'big') << 2)
+        down = (int.from_bytes(row.translate(WALL_BIT[DOWN]), 'big')
+                | int.from_bytes(here, 'big') << 1
+                | int.from_bytes(nxt, 'big') << 2)
+        cell_line[1::2] = colours[y * width:(y + 1) * width]
+        cell_line[2::2] = right.to_bytes(width, 'big').translate(PASSAGES)
+        wall_line[1::2] = down.to_bytes(width, 'big').translate(PASSAGES)
+        emit(cell_line)
+        emit(wall_line)
+    pending.extend(compressor.flush())
+    _chunk(out, b'IDAT', bytes(pending))
+    _chunk(out, b'IEND', b'')
+
+
+def export_png(maze, filename, scale=None):
+    with open(filename, 'wb') as f:
+        write_png(maze, f, scale)
+
+
+if __name__ == '__main__':
+    import argparse
+    import time
+    from echo_maze import EchoMaze
+    parser = argparse.ArgumentParser(description='Generate a maze and export it as ASCII and/or PNG.')
+    parser.add_argument('width', type=int)
+    parser.add_argument('height', type=int)
+    parser.add_argument('--difficulty', default='easy', choices=('easy', 'medium', 'hard'))
+    parser.add_argument('--seed', type=int)
+    parser.add_argument('--ascii', help='text file to write ("-" for stdout)')
+    parser.add_argument('--png', help='PNG file to write')
+    parser.add_argument('--scale', type=int)
+    args = parser.parse_args()
+    start = time.perf_counter()
+    maze = EchoMaze(args.width, args.height, args.difficulty, seed=args.seed)
+    print(f"generated in {time.perf_counter() - start:.2f}s", file=sys.stderr)
+    if args.ascii:
+        start = time.perf_counter()
+        if args.ascii == '-':
+            write_ascii(maze)
+        else:
+            export_ascii(maze, args.ascii)
+        print(f"ASCII in {time.perf_counter() - start:.2f}s", file=sys.stderr)
+    if args.png:
+        start = time.perf_counter()
+        export_png(maze, args.png, args.scale)
+        print(f"PNG in {time.perf_counter() - start:.2f}s", file=sys.stderr)
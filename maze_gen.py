@@ -0,0 +1,198 @@
+"""
+Maze carving engines.
+
+Every generator has the signature gen(grid, width, height, start, rng): it knocks
+walls out of a packed grid (see maze_grid) in place and leaves a perfect maze.
+None of them recurse, so they work at any size.
+"""
+
+import random
+import time
+from itertools import permutations
+
+from maze_grid import WALL_BITS
+
+# Direction indices match maze_grid.DIR_NAMES: UP, DOWN, RIGHT, LEFT
+UP, DOWN, RIGHT, LEFT = range(4)
+ORDERS = list(permutations(range(4)))
+
+
+def _knock(grid, a, b, d):
+    """Open the wall between cell a and its neighbour b in direction d."""
+    grid[a] &= ~(1 << d)
+    grid[b] &= ~(1 << (d ^ 1))
+
+
+def carve_backtracker(grid, width, height, start, rng):
+    """Randomized depth-first search (recursive backtracker) with an explicit stack."""
+    visited = bytearray(width * height)
+    cell = start[1] * width + start[0]
+    visited[cell] = 1
+    stack = [(cell, iter(ORDERS[rng.randrange(24)]))]
+    while stack:
+        cell, dirs = stack[-1]
+        y, x = divmod(cell, width)
+        for d in dirs:
+            if d == UP:
+                nxt = cell - width if y > 0 else -1
+            elif d == DOWN:
+                nxt = cell + width if y < height - 1 else -1
+            elif d == RIGHT:
+                nxt = cell + 1 if x < width - 1 else -1
+            else:
+                nxt = cell - 1 if x > 0 else -1
+            if nxt >= 0 and not visited[nxt]:
+                visited[nxt] = 1
+                _knock(grid, cell, nxt, d)
+                stack.append((nxt, iter(ORDERS[rng.randrange(24)])))
+                break
+        else:
+            stack.pop()
+
+
+def carve_kruskal(grid, width, height, start, rng):
+    """Randomized Kruskal: shuffle all inner walls, open those joining two trees."""
+    parent = list(range(width * height))
+
+    def find(a):
+        while parent[a] != a:
+            parent[a] = parent[parent[a]]
+            a = parent[a]
+        return a
+
+    # edge e = cell * 2 + (0 for RIGHT, 1 for DOWN)
+    edges = [c * 2 for c in range(width * height) if c % width != width - 1]
+    edges += [c * 2 + 1 for c in range(width * (height - 1))]
+    rng.shuffle(edges)
+    remaining = width * height - 1
+    for e in edges:
+        cell, down = divmod(e, 2)
+        nxt = cell + width if down else cell + 1
+        ra, rb = find(cell), find(nxt)
+        if ra != rb:
+            parent[ra] = rb
+            _knock(grid, cell, nxt, DOWN if down else RIGHT)
+            remaining -= 1
+            if not remaining:
+                break
+
+
+def carve_eller(grid, width, height, start, rng):
+    """Eller's algorithm: one row at a time, O(width) memory for the row sets."""
+    labels = [0] * width
+    next_label = 1
+    for y in range(height):
+        row = y * width
+        last = y == height - 1
+        for x in range(width):
+            if not labels[x]:
+                labels[x] = next_label
+                next_label += 1
+        members = {}
+        for x in range(width):
+            members.setdefault(labels[x], []).append(x)
+        # Randomly join horizontal neighbours from different sets (all of them on the last row)
+        for x in range(width - 1):
+            keep, gone = labels[x], labels[x + 1]
+            if keep != gone and (last or rng.random() < 0.5):
+                _knock(grid, row + x, row + x + 1, RIGHT)
+                if len(members[keep]) < len(members[gone]):
+                    keep, gone = gone, keep
+                for k in members[gone]:
+                    labels[k] = keep
+                members[keep].extend(members.pop(gone))
+        if last:
+            break
+        # Every set sends at least one cell down to the next row
+        below = [0] * width
+        for label, xs in members.items():
+            rng.shuffle(xs)
+            for k, x in enumerate(xs):
+                if k == 0 or rng.random() < 0.3:
+                    _knock(grid, row + x, row + width + x, DOWN)
+                    below[x] = label
+        labels = below
+
+
+def carve_wilson(grid, width, height, start, rng):
+    """Wilson's algorithm: loop-erased random walks give a uniform spanning tree."""
+    total = width * height
+    in_tree = bytearray(total)
+    heading = bytearray(total)
+    in_tree[start[1] * width + start[0]] = 1
+    for origin in range(total):
+        if in_tree[origin]:
+            continue
+        # Random walk until the tree is hit; overwriting heading erases loops
+        cell = origin
+        while not in_tree[cell]:
+            y, x = divmod(cell, width)
+            while True:
+                d = rng.randrange(4)
+                if d == UP and y > 0:
+                    nxt = cell - width
+                elif d == DOWN and y < height - 1:
+                    nxt = cell + width
+                elif d == RIGHT and x < width - 1:
+                    nxt = cell + 1
+                elif d == LEFT and x > 0:
+                    nxt = cell - 1
+                else:
+                    continue
+                break
+            heading[cell] = d
+            cell = nxt
+        # Carve the loop-erased path into the tree
+        cell = origin
+        while not in_tree[cell]:
+            d = heading[cell]
+            nxt = cell + (-width, width, 1, -1)[d]
+            _knock(grid, cell, nxt, d)
+            in_tree[cell] = 1
+            cell = nxt
+
+
+def carve_binary_tree(grid, width, height, start, rng):
+    """
+    Binary tree: every cell opens UP or LEFT at random (the top row only LEFT,
+    the left column only UP). Each cell decides on its own, which is what lets
+    maze_batch build many of these mazes at once.
+    """
+    for y in range(height):
+        row = y * width
+        for x in range(width):
+            cell = row + x
+            if y and (not x or rng.random() < 0.5):
+                _knock(grid, cell, cell - width, UP)
+            elif x:
+                _knock(grid, cell, cell - 1, LEFT)
+
+
+GENERATORS = {
+    'backtracker': carve_backtracker,
+    'kruskal': carve_kruskal,
+    'eller': carve_eller,
+    'wilson': carve_wilson,
+    'binary_tree': carve_binary_tree,
+}
+
+
+def benchmark(sizes=(10, 30, 100, 300), repeat=3, seed=0):
+    """Time every generator on square mazes; returns {(name, size): cells per second}."""
+    rng = random.Random(seed)
+    results = {}
+    for name, gen in GENERATORS.items():
+        for size in sizes:
+            best = float('inf')
+            for _ in range(repeat):
+                grid = bytearray([WALL_BITS]) * (size * size)
+                t0 = time.perf_counter()
+                gen(grid, size, size, (0, 0), rng)
+                best = min(best, time.perf_counter() - t0)
+            results[(name, size)] = size * size / best
+            print(f"{name:12s} {size:5d}x{size:<5d} {size * size / best:12,.0f} cells/s")
+    return results
+
+
+if __name__ == '__main__':
+    benchmark()
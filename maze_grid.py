@@ -0,0 +1,251 @@
+from collections.abc import Mapping, MutableSet
+
+# Per-cell bit layout of the packed grid (one byte per cell):
+#   bits 0-3  walls UP, DOWN, RIGHT, LEFT (set = wall present)
+#   bit  4    ice floor
+#   bit  5    monster
+DIR_NAMES = ('UP', 'DOWN', 'RIGHT', 'LEFT')
+DIR_INDEX = {d: i for i, d in enumerate(DIR_NAMES)}
+DIR_BIT = {d: 1 << i for i, d in enumerate(DIR_NAMES)}
+WALL_BITS = 0x0F
+ICE = 0x10
+MONSTER = 0x20
+
+# Echo table codes: bits 0-1 what was hit, bits 2-3 how many steps further away
+ECHO_NONE, ECHO_WALL, ECHO_MONSTER, ECHO_EXIT = range(4)
+ECHO_TYPES = (None, 'wall', 'monster', 'exit')
+
+# Number of open sides for every possible cell byte
+OPEN_SIDES = bytes(4 - bin(b & WALL_BITS).count('1') for b in range(256))
+# 1 for cells with at least one wall knocked down
+OPEN_TABLE = bytes(1 if b & WALL_BITS != WALL_BITS else 0 for b in range(256))
+# translate() tables that reduce a cell byte to 1/0 for a single flag
+MONSTER_TABLE = bytes(1 if b & MONSTER else 0 for b in range(256))
+ICE_TABLE = bytes(1 if b & ICE else 0 for b in range(256))
+CLEAR_ICE = bytes(b & ~ICE for b in range(256))
+CLEAR_MONSTER = bytes(b & ~MONSTER for b in range(256))
+
+
+def bernoulli_table(p):
+    """translate() table turning a random byte into 1 with probability p (in 1/256 steps)."""
+    cut = round(p * 256)
+    return bytes(1 if b < cut else 0 for b in range(256))
+
+
+# Writes through the views below call on_change(cell), if given, with the index
+# of the changed cell (None after a bulk write), so the owning maze can update
+# the lookup tables derived from the grid.
+
+
+class CellView(Mapping):
+    """Dict-like view of one cell's walls: cells[idx]['UP'] -> True if walled."""
+    __slots__ = ('_grid', '_idx', '_on_change')
+
+    def __init__(self, grid, idx, on_change=None):
+        self._grid = grid
+        self._idx = idx
+        self._on_change = on_change
+
+    def __getitem__(self, direction):
+        return bool(self._grid[self._idx] & DIR_BIT[direction])
+
+    def __setitem__(self, direction, wall):
+        if wall:
+            self._grid[self._idx] |= DIR_BIT[direction]
+        else:
+            self._grid[self._idx] &= ~DIR_BIT[direction] & 0xFF
+        if self._on_change:
+            self._on_change(self._idx)
+
+    def __iter__(self):
+        return iter(DIR_NAMES)
+
+    def __len__(self):
+        return 4
+
+
+class CellsView:
+    """List-like view over the packed grid, compatible with the old list of wall dicts."""
+    __slots__ = ('_grid', '_on_change')
+
+    def __init__(self, grid, on_change=None):
+        self._grid = grid
+        self._on_change = on_change
+
+    def __getitem__(self, idx):
+        if idx < 0:
+            idx += len(self._grid)
+        if not 0 <= idx < len(self._grid):
+            raise IndexError('cell index out of range')
+        return CellView(self._grid, idx, self._on_change)
+
+    def __len__(self):
+        return len(self._grid)
+
+    def __iter__(self):
+        for idx in range(len(self._grid)):
+            yield CellView(self._grid, idx, self._on_change)
+
+
+class FloorRow:
+    """One row of the floor view: floor_type[y][x] -> 'ice' or 'floor'."""
+    __slots__ = ('_grid', '_base', '_width', '_on_change')
+
+    def __init__(self, grid, base, width, on_change=None):
+        self._grid = grid
+        self._base = base
+        self._width = width
+        self._on_change = on_change
+
+    def __getitem__(self, x):
+        if not 0 <= x < self._width:
+            raise IndexError('column out of range')
+        return 'ice' if self._grid[self._base + x] & ICE else 'floor'
+
+    def __setitem__(self, x, kind):
+        if not 0 <= x < self._width:
+            raise IndexError('column out of range')
+        if kind == 'ice':
+            self._grid[self._base + x] |= ICE
+        else:
+            self._grid[self._base + x] &= ~ICE & 0xFF
+        if self._on_change:
+            self._on_change(self._base + x)
+
+    def __len__(self):
+        return self._width
+
+    def __iter__(self):
+        for x in range(self._width):
+            yield self[x]
+
+
+class FloorView:
+    """List-of-rows view of the ice bits, compatible with the old floor_type lists."""
+    __slots__ = ('_grid', '_width', '_height', '_on_change')
+
+    def __init__(self, grid, width, height, on_change=None):
+        self._grid = grid
+        self._width = width
+        self._height = height
+        self._on_change = on_change
+
+    def __getitem__(self, y):
+        if not 0 <= y < self._height:
+            raise IndexError('row out of range')
+        return FloorRow(self._grid, y * self._width, self._width, self._on_change)
+
+    def __len__(self):
+        return self._height
+
+    def __iter__(self):
+        for y in range(self._height):
+            yield self[y]
+
+
+class MonsterView(MutableSet):
+    """Set-of-(x, y) view of the monster bits."""
+    __slots__ = ('_grid', '_width', '_height', '_on_change')
+
+    def __init__(self, grid, width, height, on_change=None):
+        self._grid = grid
+        self._width = width
+        self._height = height
+        self._on_change = on_change
+
+    @classmethod
+    def _from_iterable(cls, it):
+        return set(it)
+
+    def _index(self, pos):
+        try:
+            x, y = pos
+        except (TypeError, ValueError):
+            return None
+        if 0 <= x < self._width and 0 <= y < self._height:
+            return y * self._width + x
+        return None
+
+    def __contains__(self, pos):
+        idx = self._index(pos)
+        return idx is not None and bool(self._grid[idx] & MONSTER)
+
+    def __iter__(self):
+        mask = self._grid.translate(MONSTER_TABLE)
+        width = self._width
+        idx = mask.find(1)
+        while idx != -1:
+            yield (idx % width, idx // width)
+            idx = mask.find(1, idx + 1)
+
+    def __len__(self):
+        return self._grid.translate(MONSTER_TABLE).count(1)
+
+    def add(self, pos):
+        idx = self._index(pos)
+        if idx is None:
+            raise ValueError(f'monster position {pos!r} is outside the maze')
+        self._grid[idx] |= MONSTER
+        if self._on_change:
+            self._on_change(idx)
+
+    def discard(self, pos):
+        idx = self._index(pos)
+        if idx is not None:
+            self._grid[idx] &= ~MONSTER & 0xFF
+            if self._on_change:
+                self._on_change(idx)
+
+    def clear(self):
+        # one translate instead of MutableSet's pop() per monster, each a full scan
+        self._grid[:] = self._grid.translate(CLEAR_MONSTER)
+        if self._on_change:
+            self._on_change(None)
+
+    def __repr__(self):
+        return f'MonsterView({set(self)!r})'
+
+
+class SlideView:
+    """
+    Dict-like view of the move table: slide_dest[(x, y)][direction] is where a
+    move from (x, y) ends after any ice slide, or None if a wall blocks it.
+    """
+    __slots__ = ('_dest', '_width', '_height')
+
+    def __init__(self, dest, width, height):
+        self._dest = dest
+        self._width = width
+        self._height = height
+
+    def __contains__(self, pos):
+        return self.get(pos) is not None
+
+    def __getitem__(self, pos):
+        result = self.get(pos)
+        if result is None:
+            raise KeyError(pos)
+        return result
+
+    def get(self, pos, default=None):
+        try:
+            x, y = pos
+        except (TypeError, ValueError):
+            return default
+        if not (0 <= x < self._width and 0 <= y < self._height):
+            return default
+        base = (y * self._width + x) * 4
+        width = self._width
+        result = {}
+        for d, name in enumerate(DIR_NAMES):
+            dest = self._dest[base + d]
+            result[name] = (dest % width, dest // width) if dest >= 0 else None
+        return result
+
+    def __len__(self):
+        return self._width * self._height
+
+    def __iter__(self):
+        for y in range(self._height):
+            for x in range(self._width):
+                yield (x, y)
@@ -0,0 +1,180 @@
+"""
+Compact binary maze files and memory-mapped maze corpora.
+
+Maze record (little-endian):
+    header   RECORD_HEADER (magic, size, difficulty, generator, seed, start, end, solution length)
+    grid     width * height bytes, the packed grid as-is (walls, ice, monsters; see maze_grid)
+    solution solution length * uint32 cell indices
+
+Corpus file:
+    header   CORPUS_HEADER (magic, version, count, index offset)
+    records  maze records back to back
+    index    count * uint64 record offsets
+Any maze can be loaded by number straight from the mmap without parsing the others.
+"""
+
+import mmap
+import os
+import struct
+from array import array
+from sys import byteorder
+from echo_maze import EchoMaze
+from maze_gen import GENERATORS
+from maze_seeds import derive_seed
+
+RECORD_MAGIC = b'EMZ1'
+CORPUS_MAGIC = b'EMC1'
+CORPUS_VERSION = 1
+RECORD_HEADER = struct.Struct('<4sIIBBxxQIII')
+CORPUS_HEADER = struct.Struct('<4sIQQ')
+OFFSET = struct.Struct('<Q')
+
+DIFFICULTIES = ('easy', 'medium', 'hard')
+GENERATOR_NAMES = tuple(GENERATORS)
+
+
+def _to_le(values):
+    if byteorder != 'little':
+        values.byteswap()
+    return values
+
+
+def dumps(maze):
+    """Serialize a maze into one binary record."""
+    if maze.seed is not None and not 0 <= maze.seed < 1 << 64:
+        raise ValueError(f"Seed {maze.seed} does not fit in 64 bits")
+    width = maze.width
+    solution = _to_le(array('I', (y * width + x for x, y in maze.solution)))
+    header = RECORD_HEADER.pack(
+        RECORD_MAGIC, width, maze.height,
+        DIFFICULTIES.index(maze.difficulty), GENERATOR_NAMES.index(maze.generator),
+        maze.seed if maze.seed is not None else 0,
+        maze.idx(*maze.start), maze.idx(*maze.end), len(solution))
+    return b''.join((header, maze.grid, solution.tobytes()))
+
+
+def loads(buf, offset=0):
+    """Rebuild a maze from a record at buf[offset:]; buf may be bytes, a memoryview or an mmap."""
+    magic, width, height, difficulty, generator, seed, start, end, sol_len = \
+        RECORD_HEADER.unpack_from(buf, offset)
+    if magic != RECORD_MAGIC:
+        raise ValueError(f"Not a maze record at offset {offset}")
+    cells = width * height
+    pos = offset + RECORD_HEADER.size
+    grid = buf[pos:pos + cells]
+    pos += cells
+    solution = array('I')
+    solution.frombytes(buf[pos:pos + 4 * sol_len])
+    _to_le(solution)
+    return EchoMaze.from_grid(
+        width, height, grid,
+        (start % width, start // width), (end % width, end // width),
+        difficulty=DIFFICULTIES[difficulty],
+        solution=[(i % width, i // width) for i in solution],
+        generator=GENERATOR_NAMES[generator], seed=seed)
+
+
+def save_maze(maze, filename):
+    with open(filename, 'wb') as f:
+        f.write(dumps(maze))
+
+
+def load_maze(filename):
+    with open(filename, 'rb') as f:
+        return loads(f.read())
+
+
+class CorpusWriter:
+    """Append mazes to a corpus file; the offset index is written on close()."""
+
+    def __init__(self, filename):
+        self.filename = filename
+        self._file = open(filename, 'wb')
+        self._offsets = array('Q')
+        self._file.write(CORPUS_HEADER.pack(CORPUS_MAGIC, CORPUS_VERSION, 0, 0))
+
+    def append(self, maze):
+        """Write one maze and return its number in the corpus."""
+        self._offsets.append(self._file.tell())
+        self._file.write(dumps(maze))
+        return len(self._offsets) - 1
+
+    def close(self):
+        if self._file.closed:
+            return
+        # keep the index 8-byte aligned
+        pad = -self._file.tell() % 8
+        self._file.write(b'\0' * pad)
+        index_offset = self._file.tell()
+        self._file.write(_to_le(self._offsets).tobytes())
+        self._file.seek(0)
+        self._file.write(CORPUS_HEADER.pack(CORPUS_MAGIC, CORPUS_VERSION, len(self._offsets), index_offset))
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class Corpus:
+    """Read-only, memory-mapped corpus: corpus[i] loads maze number i."""
+
+    def __init__(self, filename):
+        self.filename = filename
+        with open(filename, 'rb') as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.count, self._index = CORPUS_HEADER.unpack_from(self._mm, 0)
+        if magic != CORPUS_MAGIC:
+            raise ValueError(f"{filename} is not a maze corpus")
+        if version != CORPUS_VERSION:
+            raise ValueError(f"Unsupported corpus version {version}")
+
+    def __len__(self):
+        return self.count
+
+    def offset(self, i):
+        if not 0 <= i < self.count:
+            raise IndexError('maze number out of range')
+        return OFFSET.unpack_from(self._mm, self._index + 8 * i)[0]
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += self.count
+        return loads(self._mm, self.offset(i))
+
+    def __iter__(self):
+        for i in range(self.count):
+            yield self[i]
+
+    def close(self):
+        self._mm.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def build_corpus(filename, count, width=10, height=10, difficulty='easy', seed=0, generator='backtracker'):
+    """Generate `count` mazes with the same per-run seeds as ai.run_batch(seed=seed)."""
+    with CorpusWriter(filename) as writer:
+        for i in range(count):
+            writer.append(EchoMaze(width, height, difficulty, generator=generator, seed=derive_seed(seed, i)))
+    return os.path.getsize(filename)
+
+
+if __name__ == '__main__':
+    import argparse
+    parser = argparse.ArgumentParser(description='Build a maze corpus file.')
+    parser.add_argument('filename')
+    parser.add_argument('--count', type=int, default=1000)
+    parser.add_argument('--size', type=int, nargs=2, default=(10, 10), metavar=('W', 'H'))
+    parser.add_argument('--difficulty', default='easy', choices=DIFFICULTIES)
+    parser.add_argument('--generator', default='backtracker', choices=GENERATOR_NAMES)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    size = build_corpus(args.filename, args.count, *args.size, args.difficulty, args.seed, args.generator)
+    print(f"Wrote {args.count} mazes to {args.filename} ({size} bytes)")
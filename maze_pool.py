@@ -0,0 +1,94 @@
+import threading
+from collections import deque
+from echo_maze import EchoMaze
+
+
+class MazePool:
+    """
+    Keeps a few ready-made mazes per (difficulty, width, height).
+    - A daemon thread tops the pool up in the background
+    - get() hands out a ready maze in O(1), or builds one on the spot (a miss)
+    - take() hands out a ready maze or None, so the caller can build misses elsewhere
+    - only kinds registered with want() are kept ready; other sizes are never stored
+    - pause()/resume() keep the builder off the CPU while a game is running
+    """
+    def __init__(self, size=2):
+        self.size = size
+        self.hits = 0
+        self.misses = 0
+        self._ready = {}
+        self._cond = threading.Condition()
+        self._paused = False
+        self._stopped = False
+        self._thread = None
+
+    def want(self, difficulty, width=10, height=10):
+        """Start keeping `size` mazes of this kind ready."""
+        with self._cond:
+            self._ready.setdefault((difficulty, width, height), deque())
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._fill, name='maze-pool', daemon=True)
+                self._thread.start()
+            self._cond.notify()
+
+    def get(self, difficulty, width=10, height=10):
+        """Take a ready maze, or build one synchronously if none is waiting."""
+        maze = self.take(difficulty, width, height)
+        if maze is None:
+            maze = EchoMaze(width, height, difficulty)
+        return maze
+
+    def take(self, difficulty, width=10, height=10):
+        """Take a ready maze without blocking; None on a miss (the kind is not registered)."""
+        with self._cond:
+            ready = self._ready.get((difficulty, width, height))
+            if ready:
+                self.hits += 1
+                self._cond.notify()
+                return ready.popleft()
+            self.misses += 1
+        return None
+
+    def pause(self):
+        """Stop building new mazes (e.g. while the player is in a game)."""
+        with self._cond:
+            self._paused = True
+
+    def resume(self):
+        """Resume background building (e.g. on menu and end screens)."""
+        with self._cond:
+            self._paused = False
+            self._cond.notify()
+
+    def stop(self):
+        with self._cond:
+            self._stopped = True
+            self._cond.notify()
+
+    def stats(self):
+        """Hit/miss counters and the number of ready mazes per key."""
+        with self._cond:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'ready': {key: len(q) for key, q in self._ready.items()},
+            }
+
+    def _next_key(self):
+        for key, ready in self._ready.items():
+            if len(ready) < self.size:
+                return key
+        return None
+
+    def _fill(self):
+        while True:
+            with self._cond:
+                while not self._stopped and (self._paused or self._next_key() is None):
+                    self._cond.wait()
+                if self._stopped:
+                    return
+                key = self._next_key()
+            difficulty, width, height = key
+            maze = EchoMaze(width, height, difficulty)
+            with self._cond:
+                self._ready[key].append(maze)
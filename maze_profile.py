@@ -0,0 +1,178 @@
+import math
+from time import perf_counter_ns
+
+
+class PhaseProfiler:
+    """
+    Low-overhead generation profiler:
+    - lap(phase) charges the time since the previous lap to that phase (perf_counter_ns)
+    - keyword arguments to lap() add to named operation counters; they are
+      evaluated before lap() reads the clock, so pass only cheap ones there
+    - count() adds counters that are costly to compute: call it right after
+      lap(), and the time spent computing them is charged to no phase
+    """
+    def __init__(self):
+        self.phases = {}
+        self.counters = {}
+        self._start = self._last = perf_counter_ns()
+        self._skipped = 0
+
+    def lap(self, phase, **counters):
+        now = perf_counter_ns()
+        self.phases[phase] = self.phases.get(phase, 0) + now - self._last
+        self._last = now
+        for name, value in counters.items():
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def count(self, **counters):
+        now = perf_counter_ns()
+        self._skipped += now - self._last
+        self._last = now
+        for name, value in counters.items():
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def result(self):
+        return {
+            'phases_ns': dict(self.phases),
+            'counters': dict(self.counters),
+            'total_ns': self._last - self._start - self._skipped,
+        }
+
+
+def percentile(sorted_values, q):
+    """Nearest-rank percentile of an already sorted list (q in 0..100)."""
+    if not sorted_values:
+        return 0
+    rank = max(1, -(-len(sorted_values) * q // 100))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+class Histogram:
+    """
+    Streaming histogram for non-negative values:
+    - values fall into log-spaced buckets (bucket k holds [base**k, base**(k+1))),
+      so memory grows with the range of the values, not their count
+    - percentile() reads the buckets and is within `precision` of the exact value
+    - count, mean, min and max are exact; percentiles of whole numbers are rounded
+    """
+    def __init__(self, precision=0.01):
+        self.base = 1 + 2 * precision
+        self._log_base = math.log(self.base)
+        self.buckets = {}
+        self.zeros = 0
+        self.count = 0
+        self.total = 0
+        self.min = self.max = None
+        self.integer = True
+
+    def add(self, value):
+        self.count += 1
+        if self.integer and not isinstance(value, int):
+            self.integer = False
+        self.total += value
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+        if value <= 0:
+            self.zeros += 1
+        else:
+            k = math.floor(math.log(value) / self._log_base)
+            self.buckets[k] = self.buckets.get(k, 0) + 1
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else 0
+
+    def percentile(self, q):
+        """Nearest-rank percentile (q in 0..100), as the middle of its bucket."""
+        if not self.count:
+            return 0
+        rank = max(1, -(-self.count * q // 100))
+        seen = self.zeros
+        if rank <= seen:
+            return self.min
+        for k in sorted(self.buckets):
+            seen += self.buckets[k]
+            if seen >= rank:
+                value = min(max(self.base ** (k + 0.5), self.min), self.max)
+                return round(value) if self.integer else value
+        return self.max
+
+    def summary(self, quantiles=(50, 90, 99)):
+        result = {'mean': self.mean, 'min': self.min, 'max': self.max}
+        for q in quantiles:
+            result[f'p{q}'] = self.percentile(q)
+        return result
+
+
+def wilson_interval(successes, runs, z=1.96):
+    """Wilson score interval (low, high) for a success rate; z=1.96 gives 95% confidence."""
+    if not runs:
+        return 0.0, 1.0
+    p = successes / runs
+    z2 = z * z
+    centre = (p + z2 / (2 * runs)) / (1 + z2 / runs)
+    spread = z / (1 + z2 / runs) * math.sqrt(p * (1 - p) / runs + z2 / (4 * runs * runs))
+    return max(0.0, centre - spread), min(1.0, centre + spread)
+
+
+class PhaseStats:
+    """
+    Streaming aggregate of EchoMaze.gen_stats dicts: a Histogram per phase (and
+    the total) plus a running sum per counter, so memory does not grow with the
+    number of mazes added.
+    """
+    def __init__(self):
+        self.phases = {}
+        self.counters = {}
+
+    def add(self, stats):
+        if not stats:
+            return
+        phases = self.phases
+        for phase, ns in stats['phases_ns'].items():
+            if phase not in phases:
+                phases[phase] = Histogram()
+            phases[phase].add(ns)
+        if 'total' not in phases:
+            phases['total'] = Histogram()
+        phases['total'].add(stats['total_ns'])
+        for name, value in stats['counters'].items():
+            total, n = self.counters.get(name, (0, 0))
+            self.counters[name] = (total + value, n + 1)
+
+    def __bool__(self):
+        return bool(self.phases)
+
+    def summary(self):
+        """Per-phase mean/p50/p99 in milliseconds and the mean of every counter."""
+        summary = {'phases': {}, 'counters': {}}
+        for phase, hist in self.phases.items():
+            summary['phases'][phase] = {
+                'mean_ms': hist.mean / 1e6,
+                'p50_ms': hist.percentile(50) / 1e6,
+                'p99_ms': hist.percentile(99) / 1e6,
+            }
+        for name, (total, n) in self.counters.items():
+            summary['counters'][name] = total / n
+        return summary
+
+
+def summarize(gen_stats):
+    """
+    Aggregate a list of EchoMaze.gen_stats dicts:
+    per-phase mean/p50/p99 in milliseconds and the mean of every counter.
+    """
+    stats = PhaseStats()
+    for g in gen_stats:
+        stats.add(g)
+    return stats.summary()
+
+
+def print_summary(summary):
+    print(f"{'phase':22s} {'mean ms':>9s} {'p50 ms':>9s} {'p99 ms':>9s}")
+    for phase, row in summary['phases'].items():
+        print(f"{phase:22s} {row['mean_ms']:9.3f} {row['p50_ms']:9.3f} {row['p99_ms']:9.3f}")
+    for name, value in summary['counters'].items():
+        print(f"  avg {name}: {value:.1f}")
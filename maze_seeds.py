@@ -0,0 +1,14 @@
+"""
+Seed mixing shared by batch runs, corpora and the chunked world.
+Kept free of imports so low-level modules can use it cheaply.
+"""
+
+MASK64 = (1 << 64) - 1
+
+
+def derive_seed(base_seed, run_index):
+    """Mix a batch seed and a run number into an independent 64-bit maze seed (splitmix64)."""
+    z = (base_seed + (run_index + 1) * 0x9E3779B97F4A7C15) & MASK64
+    z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & MASK64
+    z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & MASK64
+    return z ^ (z >> 31)
@@ -0,0 +1,355 @@
+"""
+Multi-session EchoMaze server on asyncio, plus a load generator.
+
+    python maze_server.py serve --port 8765               # TCP
+    python maze_server.py serve --unix /tmp/maze.sock     # Unix socket
+    python maze_server.py load --spawn --sessions 2000    # start a server and load it
+
+One connection is one player. The line protocol is the word_play command language:
+    ECHO <dir> | MOVE <dir>   one reply line, the word_play descriptions of its events
+    NEW [difficulty] [w h]    start over on a fresh maze
+    STATS                     server counters (sessions, commands, cpu_s, rss_kb)
+    EXIT                      say goodbye and close
+Every connection runs as a coroutine on one event loop. Mazes of the preset
+kinds come from a MazePool filled in the background; any other size a player
+asks for is built once on a worker thread, so the loop never stalls on
+generation and the pool never grows beyond the presets. A connection is
+closed after idle_timeout seconds without a command. Each session is capped: its maze must fit in
+max_session_bytes (about CELL_BYTES per cell for the maze and its lookup tables),
+lines are at most MAX_LINE bytes, and replies wait for the socket to drain, so a
+slow reader cannot pile up output.
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import subprocess
+import sys
+import time
+from echo_maze import EchoMaze
+from game_session import GameSession, parse_action
+from maze_pool import MazePool
+from maze_profile import percentile
+from word_play import describe
+
+try:
+    import resource
+except ImportError:  # not on Windows
+    resource = None
+
+HOST = '127.0.0.1'
+PORT = 8765
+IDLE_TIMEOUT = 300
+MAX_SESSIONS = 10000
+MAX_LINE = 256
+# pending connections the kernel queues (asyncio's default of 100 drops bursts of new players)
+BACKLOG = 4096
+# measured with tracemalloc: an EchoMaze with its move and echo tables
+CELL_BYTES = 800
+MAX_SESSION_BYTES = 1 << 20
+# smallest side NEW accepts
+MIN_SIZE = 2
+POOL_SIZE = 64
+DIFFICULTIES = ('easy', 'medium', 'hard')
+HELP = "Commands: ECHO <dir>, MOVE <dir>, NEW [difficulty] [width height], STATS, EXIT"
+
+
+def _rss_kb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss if resource else 0
+
+
+class MazeServer:
+    """
+    Hosts one GameSession per connection.
+    - max_sessions connections at once; more are told the server is full
+    - idle_timeout seconds of silence ends a connection
+    - max_session_bytes caps the maze size a player can ask for with NEW (sides of at least MIN_SIZE)
+    - presets are the (difficulty, width, height) kinds kept ready in the pool;
+      by default every difficulty at the default size
+    """
+    def __init__(self, width=10, height=10, difficulty='easy', idle_timeout=IDLE_TIMEOUT,
+                 max_sessions=MAX_SESSIONS, max_session_bytes=MAX_SESSION_BYTES, pool_size=POOL_SIZE,
+                 presets=None):
+        self.width = width
+        self.height = height
+        self.difficulty = difficulty
+        self.idle_timeout = idle_timeout
+        self.max_sessions = max_sessions
+        self.max_session_bytes = max_session_bytes
+        self.pool = MazePool(size=pool_size)
+        if presets is None:
+            presets = [(d, width, height) for d in DIFFICULTIES]
+        for kind in presets:
+            self.pool.want(*kind)
+        self.sessions = 0
+        self.peak_sessions = 0
+        self.served = 0
+        self.commands = 0
+        self.timeouts = 0
+        self.rejected = 0
+
+    async def start(self, host=HOST, port=PORT, path=None):
+        """Listen on a Unix socket if path is given, else on TCP host:port."""
+        if path is not None:
+            return await asyncio.start_unix_server(self.handle, path, limit=MAX_LINE, backlog=BACKLOG)
+        return await asyncio.start_server(self.handle, host, port, limit=MAX_LINE, backlog=BACKLOG)
+
+    async def new_game(self, difficulty, width, height):
+        maze = self.pool.take(difficulty, width, height)
+        if maze is None:
+            loop = asyncio.get_running_loop()
+            maze = await loop.run_in_executor(None, EchoMaze, width, height, difficulty)
+        return GameSession(maze)
+
+    def stats(self):
+        return {
+            'sessions': self.sessions,
+            'peak_sessions': self.peak_sessions,
+            'served': self.served,
+            'commands': self.commands,
+            'timeouts': self.timeouts,
+            'rejected': self.rejected,
+            'pool_ready': sum(self.pool.stats()['ready'].values()),
+            'cpu_s': round(time.process_time(), 3),
+            'rss_kb': _rss_kb(),
+        }
+
+    async def handle(self, reader, writer):
+        if self.sessions >= self.max_sessions:
+            self.rejected += 1
+            writer.write(b"Server full, try again later.\n")
+            await self._close(writer)
+            return
+        self.sessions += 1
+        self.served += 1
+        self.peak_sessions = max(self.peak_sessions, self.sessions)
+        try:
+            session = await self.new_game(self.difficulty, self.width, self.height)
+            writer.write(f"Welcome to EchoMaze! You start at {session.position}. {HELP}\n".encode())
+            await writer.drain()
+            while session is not None:
+                try:
+                    line = await asyncio.wait_for(reader.readline(), self.idle_timeout)
+                except asyncio.TimeoutError:
+                    self.timeouts += 1
+                    writer.write(b"Idle timeout. Goodbye!\n")
+                    break
+                except ValueError:
+                    writer.write(b"Line too long. Goodbye!\n")
+                    break
+                if not line:
+                    break
+                self.commands += 1
+                reply, session = await self.respond(session, line.decode(errors='replace'))
+                writer.write(reply.encode() + b"\n")
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            self.sessions -= 1
+            await self._close(writer)
+
+    async def respond(self, session, text):
+        """Reply line for one command and the session to continue with (None to hang up)."""
+        words = text.upper().split()
+        if not words:
+            return HELP, session
+        verb = words[0]
+        if verb in ('ECHO', 'MOVE'):
+            try:
+                action = parse_action(text)
+            except ValueError:
+                return "Invalid direction. Use UP, DOWN, LEFT, RIGHT.", session
+            if session.over:
+                return "The game is over. Send NEW to play again or EXIT.", session
+            return ' '.join(describe(event) for event in session.step(action)), session
+        if verb == 'NEW':
+            difficulty, width, height = self.difficulty, self.width, self.height
+            args = words[1:]
+            if args and args[0].lower() in DIFFICULTIES:
+                difficulty = args.pop(0).lower()
+            if args:
+                try:
+                    width, height = (int(a) for a in args)
+                except ValueError:
+                    return "Usage: NEW [difficulty] [width height]", session
+                if (width < MIN_SIZE or height < MIN_SIZE
+                        or width * height * CELL_BYTES > self.max_session_bytes):
+                    return (f"Maze size not allowed (sides of at least {MIN_SIZE}, "
+                            f"at most {self.max_session_bytes // CELL_BYTES} cells)."), session
+            session = await self.new_game(difficulty, width, height)
+            return f"New {difficulty} {width}x{height} maze. You start at {session.position}.", session
+        if verb == 'STATS':
+            return ' '.join(f"{k}={v}" for k, v in self.stats().items()), session
+        if verb == 'EXIT':
+            return "Goodbye!", None
+        return "Unknown command. " + HELP, session
+
+    @staticmethod
+    async def _close(writer):
+        try:
+            await writer.drain()
+            writer.close()
+            await writer.wait_closed()
+        except ConnectionError:
+            pass
+
+
+async def serve(host=HOST, port=PORT, path=None, **options):
+    server = MazeServer(**options)
+    listener = await server.start(host, port, path)
+    where = path or f"{host}:{port}"
+    print(f"EchoMaze server on {where}", flush=True)
+    async with listener:
+        await listener.serve_forever()
+
+
+# --- load generator ----------------------------------------------------------------
+
+DIRECTIONS = ('UP', 'DOWN', 'LEFT', 'RIGHT')
+
+
+async def _connect(host, port, path):
+    if path is not None:
+        return await asyncio.open_unix_connection(path, limit=1 << 16)
+    return await asyncio.open_connection(host, port, limit=1 << 16)
+
+
+async def _query_stats(host, port, path):
+    reader, writer = await _connect(host, port, path)
+    await reader.readline()
+    writer.write(b"STATS\nEXIT\n")
+    line = (await reader.readline()).decode()
+    writer.close()
+    return {k: float(v) for k, v in (item.split('=') for item in line.split())}
+
+
+async def _player(host, port, path, commands, seed, latencies):
+    """One simulated player: random moves and echoes, NEW after every finished game."""
+    rng = random.Random(seed)
+    reader, writer = await _connect(host, port, path)
+    await reader.readline()
+    over = False
+    for _ in range(commands):
+        if over:
+            command = "NEW"
+        else:
+            command = f"{rng.choice(('MOVE', 'ECHO'))} {rng.choice(DIRECTIONS)}"
+        start = time.perf_counter()
+        writer.write(command.encode() + b"\n")
+        reply = await reader.readline()
+        latencies.append(time.perf_counter() - start)
+        over = b"Game Over" in reply or b"you win" in reply
+    writer.write(b"EXIT\n")
+    await reader.readline()
+    writer.close()
+
+
+async def run_load(host=HOST, port=PORT, path=None, sessions=1000, commands=50, rate=1.0, seed=0):
+    """
+    Open `sessions` connections at once, play `commands` commands on each and
+    return latency percentiles plus the server CPU time per command. A human
+    player sends about `rate` commands per second, so one core keeps
+    1 / (cpu per command * rate) such players going.
+    """
+    before = await _query_stats(host, port, path)
+    latencies = []
+    start = time.perf_counter()
+    results = await asyncio.gather(*(_player(host, port, path, commands, seed + i, latencies)
+                                     for i in range(sessions)), return_exceptions=True)
+    wall = time.perf_counter() - start
+    after = await _query_stats(host, port, path)
+    errors = [r for r in results if isinstance(r, Exception)]
+    latencies.sort()
+    done = after['commands'] - before['commands']
+    cpu_per_command = (after['cpu_s'] - before['cpu_s']) / done if done else 0
+    return {
+        'sessions': sessions,
+        'errors': len(errors),
+        'commands': len(latencies),
+        'seconds': wall,
+        'commands_per_s': len(latencies) / wall if wall else 0,
+        'p50_ms': percentile(latencies, 50) * 1e3,
+        'p99_ms': percentile(latencies, 99) * 1e3,
+        'server_cpu_us_per_command': cpu_per_command * 1e6,
+        'sessions_per_core': 1 / (cpu_per_command * rate) if cpu_per_command else None,
+        'server_peak_sessions': after['peak_sessions'],
+        'server_rss_kb': after['rss_kb'],
+    }
+
+
+def _raise_fd_limit():
+    if resource:
+        soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+        resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+
+
+async def _wait_ready(host, port, path, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            await _query_stats(host, port, path)
+            return
+        except OSError:
+            if time.monotonic() > deadline:
+                raise
+            await asyncio.sleep(0.05)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='EchoMaze multi-session server and load generator.')
+    sub = parser.add_subparsers(dest='command', required=True)
+    for command in ('serve', 'load'):
+        p = sub.add_parser(command)
+        p.add_argument('--host', default=HOST)
+        p.add_argument('--port', type=int, default=PORT)
+        p.add_argument('--unix', default=None, help='Unix socket path instead of TCP')
+        p.add_argument('--difficulty', choices=DIFFICULTIES, default='easy')
+        p.add_argument('--size', type=int, nargs=2, default=(10, 10), metavar=('WIDTH', 'HEIGHT'))
+        p.add_argument('--idle-timeout', type=float, default=IDLE_TIMEOUT)
+        p.add_argument('--max-sessions', type=int, default=MAX_SESSIONS)
+        if command == 'load':
+            p.add_argument('--sessions', type=int, default=1000)
+            p.add_argument('--commands', type=int, default=50, help='commands per session')
+            p.add_argument('--rate', type=float, default=1.0, help='commands per second of a human player')
+            p.add_argument('--spawn', action='store_true', help='start a server subprocess for the run')
+    args = parser.parse_args(argv)
+    _raise_fd_limit()
+    options = dict(width=args.size[0], height=args.size[1], difficulty=args.difficulty,
+                   idle_timeout=args.idle_timeout, max_sessions=args.max_sessions)
+    if args.command == 'serve':
+        try:
+            asyncio.run(serve(args.host, args.port, args.unix, **options))
+        except KeyboardInterrupt:
+            pass
+        return 0
+
+    server = None
+    if args.spawn:
+        cmd = [sys.executable, os.path.abspath(__file__), 'serve', '--host', args.host, '--port', str(args.port),
+               '--difficulty', args.difficulty, '--size', *map(str, args.size),
+               '--idle-timeout', str(args.idle_timeout), '--max-sessions', str(args.max_sessions)]
+        if args.unix:
+            cmd += ['--unix', args.unix]
+        server = subprocess.Popen(cmd, stdout=subprocess.DEVNULL)
+    try:
+        if server:
+            asyncio.run(_wait_ready(args.host, args.port, args.unix))
+        report = asyncio.run(run_load(args.host, args.port, args.unix, args.sessions, args.commands, args.rate))
+    finally:
+        if server:
+            server.terminate()
+            server.wait()
+    print(f"{report['sessions']} sessions, {report['commands']} commands in {report['seconds']:.2f}s "
+          f"({report['commands_per_s']:.0f}/s), {report['errors']} errors")
+    print(f"latency p50 {report['p50_ms']:.2f} ms, p99 {report['p99_ms']:.2f} ms")
+    print(f"server: {report['server_cpu_us_per_command']:.0f} us CPU per command, "
+          f"peak {report['server_peak_sessions']:.0f} sessions, max RSS {report['server_rss_kb'] / 1024:.0f} MiB")
+    if report['sessions_per_core']:
+        print(f"~{report['sessions_per_core']:.0f} sessions per core at {args.rate:g} commands/s per player")
+    return 1 if report['errors'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,83 @@
+import pygame
+
+BLACK = (0, 0, 0)
+
+
+class GameRenderer:
+    """
+    Dirty-rectangle renderer for the in-game view.
+    - Sprites are converted and scaled once, up front
+    - Rendered text surfaces are cached per (message, color)
+    - Only the status bar, the player tile and echo overlay tiles are redrawn,
+      and only when they change; display.update gets just those rectangles
+    """
+    def __init__(self, screen, font, player_sprites, tiles, cell_size, view_size, top=50):
+        self.screen = screen
+        self.font = font
+        self.cell_size = cell_size
+        self.view_size = view_size
+        self.top = top
+        size = (cell_size, cell_size)
+        self.player_sprites = {d: pygame.transform.scale(img, size).convert_alpha()
+                               for d, img in player_sprites.items()}
+        self.tiles = {kind: img.convert_alpha() for kind, img in tiles.items()}
+        self.status_rect = pygame.Rect(0, 0, view_size * cell_size, top)
+        self._text_cache = {}
+        self._status = None
+        self._facing = None
+        self._overlay = {}
+
+    def text(self, message, color):
+        """Rendered text surface, cached by message and color."""
+        key = (message, color)
+        surface = self._text_cache.get(key)
+        if surface is None:
+            surface = self._text_cache[key] = self.font.render(message, True, color)
+        return surface
+
+    def tile_rect(self, vx, vy):
+        return pygame.Rect(vx * self.cell_size, vy * self.cell_size + self.top, self.cell_size, self.cell_size)
+
+    def reset(self):
+        """Forget what is on screen; the next draw() repaints everything."""
+        self.screen.fill(BLACK)
+        pygame.display.flip()
+        self._status = None
+        self._facing = None
+        self._overlay = {}
+
+    def draw(self, status, color, facing, overlay):
+        """
+        status/color: status bar text; facing: player sprite direction;
+        overlay: {(vx, vy): tile kind} echo tiles to show in view coordinates.
+        """
+        screen = self.screen
+        dirty = []
+        if (status, color) != self._status:
+            screen.fill(BLACK, self.status_rect)
+            screen.blit(self.text(status, color), (10, 10))
+            dirty.append(self.status_rect)
+            self._status = (status, color)
+        if overlay != self._overlay:
+            for pos, kind in self._overlay.items():
+                if overlay.get(pos) != kind:
+                    rect = self.tile_rect(*pos)
+                    screen.fill(BLACK, rect)
+                    dirty.append(rect)
+            for pos, kind in overlay.items():
+                if self._overlay.get(pos) != kind:
+                    rect = self.tile_rect(*pos)
+                    screen.fill(BLACK, rect)
+                    screen.blit(self.tiles[kind], rect)
+                    dirty.append(rect)
+            self._overlay = dict(overlay)
+        if facing != self._facing:
+            center = self.view_size // 2
+            rect = self.tile_rect(center, center)
+            screen.fill(BLACK, rect)
+            screen.blit(self.player_sprites[facing], rect)
+            dirty.append(rect)
+            self._facing = facing
+        if dirty:
+            pygame.display.update(dirty)
+        return dirty
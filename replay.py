@@ -0,0 +1,246 @@
+"""
+Compact replay logs and headless verification.
+
+A log is self-delimiting, so a replay pack is just logs back to back:
+    header   LOG_HEADER (magic, version, maze kind, difficulty, generator,
+             width, height, chunk size, seed, CRC-32 of the grid), then for an
+             embedded maze a varint length and a maze_io record
+    actions  one byte per action: action (bits 0-2, see game_session) and
+             outcome code (bits 3-6), then a varint of milliseconds since the last action
+    trailer  END byte, then varints: final cell, moves, slides, echoes, won | dead << 1
+Outcome codes: moves 0 blocked, 1 moved, 2 slid, 3 monster, 4 moved onto
+the exit, 5 slid onto the exit; echoes 0 silence, else 1 + 3 * (type - 1) + steps.
+
+Maze kinds: seeded EchoMaze (rebuilt from the seed, and checked against the
+grid CRC so a maze built with other options is caught), ChunkedMaze (rebuilt
+from the world seed), or any other maze embedded as a maze_io record.
+
+    python replay.py verify pack.emr [more.emr ...]
+"""
+
+import struct
+import time
+import zlib
+from echo_maze import EchoMaze
+from game_session import GameSession, ECHO
+from maze_grid import ECHO_TYPES
+
+LOG_MAGIC = b'EMR1'
+LOG_VERSION = 1
+LOG_HEADER = struct.Struct('<4sBBBBIIIQI')
+END = 0xFF
+SEEDED, CHUNKED, EMBEDDED = range(3)
+DIFFICULTIES = ('easy', 'medium', 'hard')
+MOVE_OUTCOMES = {('blocked',): 0, ('moved',): 1, ('slid',): 2, ('monster',): 3,
+                 ('moved', 'exit'): 4, ('slid', 'exit'): 5}
+
+
+class ReplayMismatch(ValueError):
+    """A replayed action did not give the recorded outcome."""
+
+
+def outcome(action, events):
+    """Outcome code of one GameSession.step() result."""
+    if action >= ECHO:
+        kind = events[0]
+        if kind[0] == 'silence':
+            return 0
+        return 1 + 3 * (ECHO_TYPES.index(kind[2]) - 1) + kind[3] // 2
+    return MOVE_OUTCOMES[tuple(event[0] for event in events)]
+
+
+def _varint(out, value):
+    while value >= 0x80:
+        out.append(value & 0x7F | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _read_varint(buf, pos):
+    value = shift = 0
+    while True:
+        byte = buf[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, pos
+        shift += 7
+
+
+class ReplayRecorder:
+    """
+    Records one GameSession (pass it as GameSession(maze, recorder=...)).
+    finish(session) appends the final state and returns the log bytes.
+    """
+    def __init__(self, maze, embed=False, clock=time.monotonic):
+        from chunked_world import ChunkedMaze
+        self.clock = clock
+        self._last = clock()
+        self.log = bytearray()
+        difficulty = DIFFICULTIES.index(maze.difficulty)
+        if isinstance(maze, ChunkedMaze):
+            self.log += LOG_HEADER.pack(LOG_MAGIC, LOG_VERSION, CHUNKED, difficulty, 0,
+                                        maze.chunks_x, maze.chunks_y, maze.chunk_size, maze.seed, 0)
+        elif embed or maze.seed is None:
+            from maze_io import dumps
+            record = dumps(maze)
+            self.log += LOG_HEADER.pack(LOG_MAGIC, LOG_VERSION, EMBEDDED, difficulty, 0,
+                                        maze.width, maze.height, 0, 0, 0)
+            _varint(self.log, len(record))
+            self.log += record
+        else:
+            from maze_gen import GENERATORS
+            self.log += LOG_HEADER.pack(LOG_MAGIC, LOG_VERSION, SEEDED, difficulty,
+                                        list(GENERATORS).index(maze.generator),
+                                        maze.width, maze.height, 0, maze.seed,
+                                        zlib.crc32(maze.grid))
+        self.finished = False
+
+    def record(self, action, events):
+        now = self.clock()
+        self.log.append(action | outcome(action, events) << 3)
+        _varint(self.log, int((now - self._last) * 1000))
+        self._last = now
+
+    def finish(self, session):
+        if not self.finished:
+            self.log.append(END)
+            for value in (session.pos, session.moves, session.slides, session.echoes,
+                          session.won | session.dead << 1):
+                _varint(self.log, value)
+            self.finished = True
+        return bytes(self.log)
+
+    def save(self, filename, session):
+        with open(filename, 'wb') as f:
+            f.write(self.finish(session))
+
+
+def _maze_key(buf, pos):
+    """Header fields and where the actions start."""
+    magic, version, kind, difficulty, generator, width, height, chunk, seed, crc = LOG_HEADER.unpack_from(buf, pos)
+    if magic != LOG_MAGIC:
+        raise ValueError(f"Not a replay log at offset {pos}")
+    if version != LOG_VERSION:
+        raise ValueError(f"Unsupported replay version {version}")
+    pos += LOG_HEADER.size
+    if kind == EMBEDDED:
+        size, pos = _read_varint(buf, pos)
+        key = (kind, bytes(buf[pos:pos + size]))
+        pos += size
+    else:
+        key = (kind, difficulty, generator, width, height, chunk, seed, crc)
+    return key, pos
+
+
+def _build(key):
+    kind = key[0]
+    if kind == EMBEDDED:
+        from maze_io import loads
+        return loads(key[1])
+    _, difficulty, generator, width, height, chunk, seed, crc = key
+    if kind == CHUNKED:
+        from chunked_world import ChunkedMaze
+        return ChunkedMaze(width, height, chunk, DIFFICULTIES[difficulty], seed=seed)
+    from maze_gen import GENERATORS
+    maze = EchoMaze(width, height, DIFFICULTIES[difficulty], generator=list(GENERATORS)[generator], seed=seed)
+    if zlib.crc32(maze.grid) != crc:
+        raise ReplayMismatch(f"maze rebuilt from seed {seed} differs from the recorded one; record it with embed=True")
+    return maze
+
+
+class Verifier:
+    """
+    Replays logs headless as fast as GameSession allows and checks every
+    outcome and the final state. Rebuilt mazes are kept in a small cache, so
+    many sessions on the same maze only pay for generation once.
+    """
+    def __init__(self, cache_size=256):
+        self.cache_size = cache_size
+        self._mazes = {}
+        self.verified = 0
+        self.actions = 0
+
+    def maze(self, key):
+        maze = self._mazes.pop(key, None)
+        if maze is None:
+            maze = _build(key)
+            if len(self._mazes) >= self.cache_size:
+                del self._mazes[next(iter(self._mazes))]
+        self._mazes[key] = maze
+        return maze
+
+    def verify(self, buf, pos=0):
+        """Check the log at buf[pos:]; returns the offset just past it, raises ReplayMismatch."""
+        key, pos = _maze_key(buf, pos)
+        session = GameSession(self.maze(key))
+        step = session.step
+        n = 0
+        while True:
+            byte = buf[pos]
+            if byte == END:
+                break
+            _, pos = _read_varint(buf, pos + 1)
+            action = byte & 7
+            events = step(action)
+            if not events or outcome(action, events) != byte >> 3:
+                raise ReplayMismatch(f"action {n}: recorded outcome {byte >> 3}, replay gave {events}")
+            n += 1
+        pos += 1
+        final = []
+        for _ in range(5):
+            value, pos = _read_varint(buf, pos)
+            final.append(value)
+        actual = [session.pos, session.moves, session.slides, session.echoes, session.won | session.dead << 1]
+        if final != actual:
+            raise ReplayMismatch(f"final state {actual} does not match the recorded {final}")
+        self.verified += 1
+        self.actions += n
+        return pos
+
+    def verify_pack(self, buf):
+        """Verify every log in a replay pack; returns (ok, failures) with failures as (offset, error)."""
+        pos = ok = 0
+        failures = []
+        while pos < len(buf):
+            start = pos
+            try:
+                pos = self.verify(buf, pos)
+                ok += 1
+            except ReplayMismatch as e:
+                failures.append((start, str(e)))
+                pos = skip(buf, start)
+        return ok, failures
+
+
+def skip(buf, pos):
+    """Offset just past the log starting at pos, without replaying it."""
+    _, pos = _maze_key(buf, pos)
+    while buf[pos] != END:
+        _, pos = _read_varint(buf, pos + 1)
+    pos += 1
+    for _ in range(5):
+        _, pos = _read_varint(buf, pos)
+    return pos
+
+
+if __name__ == '__main__':
+    import argparse
+    parser = argparse.ArgumentParser(description='Verify replay logs.')
+    parser.add_argument('command', choices=('verify',))
+    parser.add_argument('files', nargs='+')
+    args = parser.parse_args()
+    verifier = Verifier()
+    total_ok = total_failed = 0
+    start = time.perf_counter()
+    for filename in args.files:
+        with open(filename, 'rb') as f:
+            ok, failures = verifier.verify_pack(f.read())
+        total_ok += ok
+        total_failed += len(failures)
+        for offset, error in failures:
+            print(f"{filename}@{offset}: {error}")
+    elapsed = time.perf_counter() - start
+    print(f"{total_ok} replays verified, {total_failed} failed, {verifier.actions} actions "
+          f"in {elapsed:.3f}s ({total_ok / elapsed if elapsed else 0:.0f} replays/s)")
+    raise SystemExit(1 if total_failed else 0)
@@ -0,0 +1,76 @@
+import pytest
+from echo_maze import EchoMaze
+
+
+@pytest.mark.parametrize('difficulty', ['easy', 'medium', 'hard'])
+@pytest.mark.parametrize('width, height', [(2, 2), (3, 2), (2, 3), (3, 3)])
+def test_tiny_mazes_generate(difficulty, width, height):
+    for seed in range(50):
+        maze = EchoMaze(width, height, difficulty, seed=seed)
+        assert maze.solution[0] == maze.start and maze.solution[-1] == maze.end
+
+
+def _check_solution(maze):
+    path = maze.solution
+    hard = maze.difficulty == 'hard'
+    if maze.solve(maze.start, maze.end, avoid_monsters=hard)[0] != maze.start:
+        assert path == [maze.end]
+        return
+    assert path[0] == maze.start and path[-1] == maze.end
+    for (ax, ay), (bx, by) in zip(path, path[1:]):
+        direction = maze.dir_by_delta(bx - ax, by - ay)
+        assert direction is not None and not maze.has_wall(ax, ay, direction)
+        assert not (hard and (bx, by) in maze.monsters)
+
+
+@pytest.mark.parametrize('difficulty', ['easy', 'hard'])
+@pytest.mark.parametrize('seed', [0, 1, 2])
+def test_random_mutations_match_rebuild(difficulty, seed):
+    import random
+    rng = random.Random(seed)
+    maze = EchoMaze(12, 9, difficulty, seed=seed)
+    maze.move_table(), maze.echo_table(), maze.distance_to_exit(), maze.distance_to_monster()
+    cells = [(x, y) for y in range(maze.height) for x in range(maze.width)]
+    for step in range(300):
+        kind = rng.randrange(4)
+        x, y = rng.choice(cells)
+        if kind < 2:
+            direction = rng.choice(list(EchoMaze.DIRECTIONS))
+            dx, dy = EchoMaze.DIRECTIONS[direction]
+            if maze.in_bounds(x + dx, y + dy):
+                (maze.open_wall if kind == 0 else maze.close_wall)(x, y, direction)
+        elif kind == 2:
+            monsters = sorted(maze.monsters)
+            if monsters and (x, y) not in maze.monsters and (x, y) not in (maze.start, maze.end):
+                maze.move_monster(rng.choice(monsters), (x, y))
+        elif (x, y) not in (maze.start, maze.end):
+            maze.set_ice(x, y, rng.random() < 0.5)
+        if step % 5:
+            continue
+        fresh = EchoMaze.from_grid(maze.width, maze.height, maze.grid, maze.start, maze.end, difficulty)
+        assert maze.move_table() == fresh.move_table()
+        assert maze.echo_table() == fresh.echo_table()
+        assert (maze.nodes, maze.corridors) == (fresh.nodes, fresh.corridors)
+        assert maze.distance_to_exit() == fresh.distance_to_exit()
+        assert maze.distance_to_monster() == fresh.distance_to_monster()
+        _check_solution(maze)
+
+
+def test_view_writes_reach_a_running_session():
+    from game_session import GameSession
+    maze = EchoMaze(10, 10, 'easy', seed=4)
+    session = GameSession(maze)
+    x, y = maze.start
+    direction = next(d for d in EchoMaze.DIRECTIONS if not maze.has_wall(x, y, d))
+    dx, dy = EchoMaze.DIRECTIONS[direction]
+    ahead = (x + dx, y + dy)
+    maze.monsters.discard(ahead)
+    maze.floor_type[y + dy][x + dx] = 'floor'
+    maze.monsters.add(ahead)
+    maze.cells[maze.idx(*ahead)]['UP'] = True
+    maze.floor_type = [['floor'] * 10 for _ in range(10)]
+    fresh = EchoMaze.from_grid(10, 10, maze.grid, maze.start, maze.end)
+    assert (session._dest, session._hazard) == fresh.move_table()
+    assert session._echo == fresh.echo_table()
+    _check_solution(maze)
+    assert session.step(4 + list(EchoMaze.DIRECTIONS).index(direction))[0][2] == 'monster'
@@ -0,0 +1,21 @@
+import pytest
+from echo_maze import EchoMaze
+
+
+@pytest.mark.parametrize('difficulty', ['easy', 'medium', 'hard'])
+@pytest.mark.parametrize('width, height', [(4, 7), (5, 9), (10, 10), (17, 12), (25, 25)])
+@pytest.mark.parametrize('seed', [0, 1, 2])
+def test_sweep_matches_pairwise(difficulty, width, height, seed):
+    maze = EchoMaze(width, height, difficulty, seed=seed)
+    maze.extract_graph()
+    nodes, corridors = maze._extract_graph_pairwise()
+    assert maze.nodes == nodes
+    assert maze.corridors == corridors
+
+
+def test_sweep_matches_pairwise_after_mutation():
+    maze = EchoMaze(15, 15, 'medium', seed=7)
+    for y in range(14):
+        if maze.has_wall(7, y, 'DOWN'):
+            maze.open_wall(7, y, 'DOWN')
+    assert (maze.nodes, maze.corridors) == maze._extract_graph_pairwise()
@@ -0,0 +1,26 @@
+import asyncio
+
+from maze_server import MazeServer
+
+
+async def _talk(tmp_path, commands):
+    server = MazeServer(pool_size=1)
+    listener = await server.start(path=str(tmp_path / 'maze.sock'))
+    async with listener:
+        reader, writer = await asyncio.open_unix_connection(str(tmp_path / 'maze.sock'))
+        replies = [await reader.readline()]
+        for command in commands:
+            writer.write(command.encode() + b"\n")
+            replies.append(await reader.readline())
+        writer.close()
+        await writer.wait_closed()
+    server.pool.stop()
+    return [r.decode() for r in replies]
+
+
+def test_new_too_small_replies_and_keeps_connection(tmp_path):
+    welcome, small, new, stats = asyncio.run(_talk(tmp_path, ["NEW 1 5", "NEW easy 2 2", "STATS"]))
+    assert welcome.startswith("Welcome")
+    assert small.startswith("Maze size not allowed")
+    assert new.startswith("New easy 2x2 maze.")
+    assert stats.startswith("sessions=1 ")
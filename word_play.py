@@ -1,12 +1,47 @@
 from echo_maze import EchoMaze
+from game_session import GameSession
+from replay import ReplayRecorder
+
+ECHO_SOUNDS = {
+    'wall': "a thud",
+    'monster': "growling",
+    'exit': "a breeze",
+}
+
+
+def describe(event):
+    """Text line for one GameSession event."""
+    kind = event[0]
+    if kind == 'blocked':
+        return "There's a wall blocking your way!"
+    if kind == 'moved':
+        return f"You moved to {event[2]}."
+    if kind == 'slid':
+        return f"You slide on ice to {event[2]}."
+    if kind == 'monster':
+        return "You stepped on a monster! Game Over."
+    if kind == 'exit':
+        return "You found the exit! Congratulations, you win!"
+    if kind == 'echo':
+        return f"You hear {ECHO_SOUNDS[event[2]]} after {event[3]} seconds."
+    if kind == 'silence':
+        return "Silence... Nothing detected within range."
+    return str(event)
 
 
 class GameEngine:
-    def __init__(self, width=10, height=10):
+    """Text front end; with record='game.emr' the session's replay log is saved there when play ends."""
+    def __init__(self, width=10, height=10, record=None):
         self.maze = EchoMaze(width, height)
-        self.player_pos = self.maze.start
+        self.record = record
+        self.recorder = ReplayRecorder(self.maze) if record else None
+        self.session = GameSession(self.maze, self.recorder)
         self.running = True
 
+    @property
+    def player_pos(self):
+        return self.session.position
+
     def start(self):
         print("\nFinal Maze State:")
         self.maze.print()
@@ -24,17 +59,8 @@ class GameEngine:
             if action == 'ECHO' and len(cmd) == 2:
                 direction = cmd[1]
                 if direction in ['UP', 'DOWN', 'LEFT', 'RIGHT']:
-                    echoes = self.maze.send_echo(self.player_pos, direction)
-                    if not echoes:
-                        print("Silence... Nothing detected within range.")
-                    else:
-                        for echo in echoes:
-                            if echo['type'] == 'wall':
-                                print(f"You hear a thud after {echo['delay']} seconds.")
-                            elif echo['type'] == 'monster':
-                                print(f"You hear growling after {echo['delay']} seconds.")
-                            elif echo['type'] == 'exit':
-                                print(f"You hear a breeze after {echo['delay']} seconds.")
+                    for event in self.session.echo(direction):
+                        print(describe(event))
                 else:
                     print("Invalid direction. Use UP, DOWN, LEFT, RIGHT.")
 
@@ -52,40 +78,14 @@ class GameEngine:
             else:
                 print("Unknown command.")
 
-    def move_player(self, direction):
-        x, y = self.player_pos
-        dx, dy = self.maze.DIRECTIONS[direction]
-        idx = self.maze._idx(x, y)
-
-        if self.maze.cells[idx][direction]:
-            print("There's a wall blocking your way!")
-            return
-
-        # Move
-        new_pos = (x + dx, y + dy)
-        if not self.maze._in_bounds(*new_pos):
-            print("You can't move outside the maze!")
-            return
-
-        self.player_pos = new_pos
-
-        # Slide
-        if self.maze.floor_type[y + dy][x + dx] == 'ice':
-            dest = self.maze.slide_dest.get(self.player_pos, {}).get(direction)
-            if dest and dest != self.player_pos:
-                print(f"You slide on ice to {dest}.")
-                self.player_pos = dest
-            else:
-                print(f"You moved to {self.player_pos}.")
-        else:
-            print(f"You moved to {self.player_pos}.")
+        if self.recorder is not None:
+            self.recorder.save(self.record, self.session)
+            print(f"Replay saved to {self.record}")
 
-        # Check game status
-        if self.player_pos in self.maze.monsters:
-            print("You stepped on a monster! Game Over.")
-            self.running = False
-        elif self.player_pos == self.maze.end:
-            print("You found the exit! Congratulations, you win!")
+    def move_player(self, direction):
+        for event in self.session.move(direction):
+            print(describe(event))
+        if self.session.over:
             self.running = False
 
 